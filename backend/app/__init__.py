@@ -6,7 +6,8 @@ def create_app():
     CORS(
     app,
     supports_credentials=True,
-    origins=["http://localhost:5173"]
+    origins=["http://localhost:5173"],
+    expose_headers=["X-Recommendation-Tier"]
 )
 
     from . import routes
@@ -27,4 +28,26 @@ def create_app():
     from routes.onboarding import bp as onboarding_bp
     app.register_blueprint(onboarding_bp)
 
+    from routes.search import bp as search_bp
+    app.register_blueprint(search_bp)
+
+    # fail fast on missing artifacts instead of on the first request
+    from app.services.artifact_registry import artifact_registry
+    artifact_registry.reload()
+
+    # cold-start lists: rebuilt again whenever a reseed bumps the generation
+    from app.services.popular_lists import popular_lists
+    popular_lists.warm()
+
+    # list pages, genre filters and counts; same rebuild rule
+    from app.services.catalog_index import catalog_index
+    catalog_index.warm()
+
+    # title search and autocomplete, same rebuild rule
+    from app.services.title_index import title_index
+    title_index.warm()
+
+    from app.services.item_index_service import start_item_index_repair
+    start_item_index_repair()
+
     return app
@@ -14,6 +14,15 @@ users_collection = db["users"]
 # NEW user interactions
 interactions_collection = db["user_interactions"]
 
+# item -> users posting lists + per-item My List counts
+item_index_collection = db["item_index"]
+
+# small bookkeeping documents (catalog generation, ...)
+meta_collection = db["meta"]
+
+# ranked ids written by precompute_recommendations.py
+user_recommendations_collection = db["user_recommendations"]
+
 # Indexes
 users_collection.create_index("my_list")
 users_collection.create_index("email", unique=True)
@@ -27,4 +36,19 @@ interactions_collection.create_index(
     unique=True
 )
 
-interactions_collection.create_index("user_id")
\ No newline at end of file
+interactions_collection.create_index("user_id")
+
+# Item index
+item_index_collection.create_index(
+    [("media_type", 1), ("tmdb_id", 1)],
+    unique=True
+)
+
+# users whose postings are replayed after a rebuild
+item_index_collection.create_index("users")
+
+# Precomputed recommendations
+user_recommendations_collection.create_index(
+    [("user_id", 1), ("media_type", 1)],
+    unique=True
+)
\ No newline at end of file
@@ -3,6 +3,7 @@ from bson import ObjectId
 
 from app.db import users_collection, movies_collection, tv_collection, interactions_collection
 from app.auth.auth_utils import get_current_user_id
+from app.services.list_events import on_list_changed
 
 bp = Blueprint("my_list", __name__, url_prefix="/api")
 
@@ -119,6 +120,11 @@ def add_to_my_list():
 
     )
 
+    on_list_changed(
+        ObjectId(user_id),
+        added=[{"tmdb_id": tmdb_id, "media_type": media_type}]
+    )
+
     return jsonify({"status": "added"})
 
 
@@ -149,6 +155,11 @@ def remove_from_my_list(tmdb_id, media_type):
 
     )
 
+    on_list_changed(
+        ObjectId(user_id),
+        removed=[{"tmdb_id": tmdb_id, "media_type": media_type}]
+    )
+
     return jsonify({"status": "removed"})
 
 @bp.route("/reset-preferences", methods=["POST"])
@@ -166,8 +177,8 @@ def reset_preferences():
         "user_id": user_object_id
     })
 
-    # clear my_list
-    users_collection.update_one(
+    # clear my_list (keep the old one to unwind the item index)
+    previous = users_collection.find_one_and_update(
         {"_id": user_object_id},
         {
             "$set": {
@@ -175,7 +186,13 @@ def reset_preferences():
                 "preferred_genres": [],
                 "onboarding_complete": False
             }
-        }
+        },
+        projection={"my_list": 1}
+    )
+
+    on_list_changed(
+        user_object_id,
+        removed=(previous or {}).get("my_list", [])
     )
 
     return jsonify({"success": True})
\ No newline at end of file
@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from app.db import movies_collection, tv_collection
+from app.services.catalog_index import DEFAULT_SORT, SORT_FIELDS, catalog_index
+from app.services.title_index import title_index
 import os
 import requests
 from dotenv import load_dotenv
@@ -9,6 +11,29 @@ TMDB_KEY = os.getenv("TMDB_KEY")
 
 bp = Blueprint("routes", __name__)
 
+
+def _cursor_page(media_type, sort_field, genre_param, limit):
+    """
+    Keyset mode of the list endpoints (?cursor=, empty for the first page):
+    no page numbers, each response carries the cursor of the next one
+    """
+    try:
+        results, total, next_cursor = catalog_index.page_after(
+            media_type, sort_field, genre_param, request.args["cursor"], limit
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "limit": limit,
+        "sort": sort_field,
+        "genre": genre_param,
+        "total": total,
+        "results": results,
+        "next_cursor": next_cursor
+    })
+
+
 @bp.route("/api/movies", methods=["GET"])
 def get_movies():
     page = int(request.args.get("page", 1))
@@ -18,44 +43,16 @@ def get_movies():
     sort_param = request.args.get("sort", "rating")
     genre_param = request.args.get("genre")
 
-    SORT_FIELDS = {
-        "rating": "rating",
-        "popularity": "popularity",
-        "year": "year"
-    }
-
-    sort_field = SORT_FIELDS.get(sort_param, "rating")
-
-    # ------------------------
-    # FILTER BUILDING
-    # ------------------------
-    filter_query = {}
-
-    # Vote cutoff for rating sort
-    if sort_field == "rating":
-        filter_query["votes"] = {"$gt": 2000}
-
-    # Genre filter
-    if genre_param:
-        filter_query["genres"] = genre_param
+    sort_field = sort_param if sort_param in SORT_FIELDS else DEFAULT_SORT
 
+    if "cursor" in request.args:
+        return _cursor_page("movie", sort_field, genre_param, limit)
 
     # ------------------------
     # QUERY
     # ------------------------
-    movies_cursor = (
-        movies_collection
-        .find(filter_query, {"_id": 0})
-        .sort([
-            (sort_field, -1),
-            ("tmdb_id", 1)
-        ])
-        .skip(skip)
-        .limit(limit)
-    )
-
-    movies = list(movies_cursor)
-    total = movies_collection.count_documents(filter_query)
+    # pre-sorted in memory, vote cutoff for rating sort already applied
+    movies, total = catalog_index.page("movie", sort_field, genre_param, skip, limit)
 
     return jsonify({
         "page": page,
@@ -141,19 +138,14 @@ def search_movies():
     if not query:
         return jsonify([])
 
-    movies = list(
-        movies_collection.find(
-            {"title": {"$regex": query, "$options": "i"}},
-            {"_id": 0}
-        ).limit(20)
-    )
+    # ranked, typo-tolerant matches from the in-process title index
+    movies = title_index.search(query, ("movie",), limit=20)
 
-    return jsonify(list(movies))
+    return jsonify(movies)
 
 @bp.route("/api/genres", methods=["GET"])
 def get_genres():
-    genres = movies_collection.distinct("genres")
-    genres = sorted(genres)
+    genres = catalog_index.genres("movie")
     return jsonify(genres)
 
 # TV Shows
@@ -170,36 +162,12 @@ def get_tv():
     sort_param = request.args.get("sort", "rating")
     genre_param = request.args.get("genre")
 
-    SORT_FIELDS = {
-        "rating": "rating",
-        "popularity": "popularity",
-        "year": "year"
-    }
-
-    sort_field = SORT_FIELDS.get(sort_param, "rating")
+    sort_field=sort_param if sort_param in SORT_FIELDS else DEFAULT_SORT
 
-    filter_query = {}
+    if "cursor" in request.args:
+        return _cursor_page("tv",sort_field,genre_param,limit)
 
-    if sort_field == "rating":
-        filter_query["votes"] = {"$gt": 500}
-
-    if genre_param:
-        filter_query["genres"] = genre_param
-
-    cursor = (
-        tv_collection
-        .find(filter_query, {"_id": 0})
-        .sort([
-            (sort_field,-1),
-            ("tmdb_id",1)
-        ])
-        .skip(skip)
-        .limit(limit)
-    )
-
-    results=list(cursor)
-
-    total=tv_collection.count_documents(filter_query)
+    results,total=catalog_index.page("tv",sort_field,genre_param,skip,limit)
 
     return jsonify({
         "page":page,
@@ -284,22 +252,11 @@ def search_tv():
     query=request.args.get("q","").strip()
     if not query:
         return jsonify([])
-    tv=list(
-        tv_collection.find(
-            {
-                "title":{
-                    "$regex":query,
-                    "$options":"i"
-                }
-            },
-            {"_id":0}
-        ).limit(20)
-    )
+    tv=title_index.search(query,("tv",),limit=20)
     return jsonify(tv)
 
 # TV Genres
 @bp.route("/api/tv/genres", methods=["GET"])
 def get_tv_genres():
-    genres=tv_collection.distinct("genres")
-    genres=sorted(genres)
+    genres=catalog_index.genres("tv")
     return jsonify(genres)
\ No newline at end of file
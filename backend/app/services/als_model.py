@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+import numpy as np
+import scipy.sparse as sp
+import os
+
+
+# rows whose normal equations are stacked into one np.linalg.solve
+SOLVE_CHUNK_ROWS = 1024
+
+
+# --- IMPLICIT ALS (Hu, Koren & Volinsky) ---
+def least_squares(
+    confidence: sp.csr_matrix,
+    fixed: np.ndarray,
+    regularization: float,
+    gram: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    One ALS half-step: the optimal factors of every row of `confidence`
+    given the `fixed` factors of its columns.
+
+    `confidence` holds alpha * weight (confidence minus one) for observed
+    pairs; preference is 1 on those and 0 elsewhere, so row u solves
+        (YtY + Yt (C_u - I) Y + reg I) x_u = Yt C_u p_u
+    Only the observed columns enter each system; YtY is shared.
+    """
+    confidence = confidence.tocsr()
+    n_rows = confidence.shape[0]
+    n_factors = fixed.shape[1]
+
+    if gram is None:
+        gram = fixed.T @ fixed + regularization * np.eye(n_factors)
+
+    out = np.zeros((n_rows, n_factors))
+    indptr, indices, data = confidence.indptr, confidence.indices, confidence.data
+
+    for start in range(0, n_rows, SOLVE_CHUNK_ROWS):
+        end = min(start + SOLVE_CHUNK_ROWS, n_rows)
+
+        A = np.repeat(gram[None], end - start, axis=0)
+        b = np.zeros((end - start, n_factors))
+
+        for row in range(start, end):
+            lo, hi = indptr[row], indptr[row + 1]
+            if lo == hi:
+                continue
+
+            factors = np.asarray(fixed[indices[lo:hi]], dtype=np.float64)
+            c = data[lo:hi].astype(np.float64)
+
+            A[row - start] += (factors.T * c) @ factors
+            b[row - start] = (1 + c) @ factors
+
+        out[start:end] = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+
+    return out
+
+
+# --- SERVING ---
+class ALSModel:
+    """
+    Trained user and item factors of one media type.
+
+    Users trained on an unchanged list score with their stored vector;
+    anyone else (new users, lists changed after the training snapshot) is
+    folded in from their current weights with a single least-squares
+    solve against the fixed item factors.
+    """
+
+    def __init__(
+        self,
+        item_ids: np.ndarray,
+        item_factors: np.ndarray,
+        user_keys: np.ndarray,
+        user_factors: np.ndarray,
+        regularization: float,
+        alpha: float,
+        signals_at: Optional[datetime] = None,
+    ):
+        self.item_ids = item_ids
+        self.item_factors = item_factors
+        self.user_factors = user_factors
+
+        self.regularization = regularization
+        self.alpha = alpha
+        self.signals_at = signals_at
+
+        self._item_rows = {tmdb_id: row for row, tmdb_id in enumerate(item_ids.tolist())}
+        self._user_rows = {key: row for row, key in enumerate(user_keys.tolist())}
+
+        factors = item_factors.astype(np.float64)
+        self._gram = factors.T @ factors + regularization * np.eye(factors.shape[1])
+
+    @property
+    def factors(self) -> int:
+        return self.item_factors.shape[1]
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def user_vector(
+        self,
+        user_key: str,
+        weights: Dict[int, float],
+        updated_at: Optional[datetime] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Stored factors when the user's signals are the ones trained on,
+        otherwise a fold-in of `weights`
+        """
+        row = self._user_rows.get(user_key)
+
+        unchanged = self.signals_at is not None and (updated_at is None or updated_at <= self.signals_at)
+        if row is not None and unchanged:
+            return self.user_factors[row]
+
+        return self.fold_in(weights)
+
+    def fold_in(self, weights: Dict[int, float]) -> Optional[np.ndarray]:
+        """
+        Factor vector for {tmdb_id: weight} without retraining
+        """
+        cols, values = [], []
+        for tmdb_id, weight in weights.items():
+            col = self._item_rows.get(tmdb_id)
+            if col is not None and weight:
+                cols.append(col)
+                values.append(self.alpha * weight)
+
+        if not cols:
+            return None
+
+        confidence = sp.csr_matrix(
+            (values, (np.zeros(len(cols), dtype=np.int64), cols)),
+            shape=(1, len(self.item_ids)),
+        )
+
+        return least_squares(confidence, self.item_factors, self.regularization, self._gram)[0]
+
+    def recommend(self, vector: np.ndarray, limit: int, exclude: Iterable[int] = ()) -> Dict[int, float]:
+        """
+        Top `limit` items for a user vector: one dot product plus top-K
+        """
+        scores = self.item_factors @ vector.astype(self.item_factors.dtype)
+
+        excluded = [self._item_rows[t] for t in exclude if t in self._item_rows]
+        scores[excluded] = -np.inf
+
+        k = min(limit, len(scores) - len(excluded))
+        if k <= 0:
+            return {}
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return {int(self.item_ids[i]): float(scores[i]) for i in top}
+
+
+def load_als_model(
+    directory: str,
+    regularization: float,
+    alpha: float,
+    signals_at: Optional[datetime] = None,
+) -> Optional[ALSModel]:
+    """
+    Memory-mapped factors written by `build_recommender.py als`
+    """
+    paths = {
+        name: os.path.join(directory, f"{name}.npy")
+        for name in ("item_ids", "item_factors", "user_keys", "user_factors")
+    }
+
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+
+    return ALSModel(
+        np.load(paths["item_ids"], mmap_mode="r"),
+        np.load(paths["item_factors"], mmap_mode="r"),
+        np.load(paths["user_keys"]),
+        np.load(paths["user_factors"], mmap_mode="r"),
+        regularization,
+        alpha,
+        signals_at,
+    )
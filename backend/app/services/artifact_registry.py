@@ -0,0 +1,501 @@
+from app.services.content_artifacts import (
+    ARTIFACTS_PATH,
+    CONTENT_SIMILARITY_MODE,
+    MODELS_PATH,
+    EmbeddingIndex,
+    RowLookup,
+    build_row_index,
+    load_embeddings,
+    load_index_to_tmdb,
+    load_neighbor_table,
+    load_neighbors,
+    load_tfidf_matrix,
+)
+from app.services.content_profile import ProfileScorer
+from app.services.content_delta import DeltaIndex
+from app.services.als_model import ALSModel, load_als_model
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import threading
+import traceback
+import pickle
+import shutil
+import json
+import time
+import sys
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+# Builders publish each component separately: `scripts/build_recommender.py
+# content` writes "content", `... collab` "collab" and `... als` "als"
+COMPONENTS = ("content", "collab", "als")
+
+MANIFEST_PATH = os.path.join(ARTIFACTS_PATH, "manifest.json")
+
+# Served when a media type/component has never been published
+LEGACY_VERSION = "legacy"
+
+# How often serving processes stat the manifest for a new version
+ARTIFACT_POLL_SECONDS = float(os.getenv("ARTIFACT_POLL_SECONDS", 10))
+
+# Published versions kept on disk per media type and component
+KEEP_VERSIONS = int(os.getenv("ARTIFACT_KEEP_VERSIONS", 3))
+
+# "item": precomputed item-item neighbors, "user": live user x item matrix,
+# "auto": item neighbors when the artifact exists, otherwise user matrix
+COLLAB_MODE = os.getenv("COLLAB_MODE", "auto")
+
+
+# --- MANIFEST / PUBLISHING (used by the build scripts) ---
+def read_manifest(root: str = ARTIFACTS_PATH) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(root, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def new_version(media_type: str, component: str, root: str = ARTIFACTS_PATH) -> Tuple[str, str]:
+    """
+    Create an empty directory for a new artifact version and return
+    (version, path). Nothing reads it until publish_version is called.
+    """
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(root, "versions", f"{media_type}-{component}-{version}")
+
+    os.makedirs(path)
+
+    return version, path
+
+
+@contextmanager
+def _manifest_lock(root: str):
+    """
+    Serialize manifest updates of builds running side by side (movie and
+    TV content publish from separate processes)
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(os.path.join(root, "manifest.lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def publish_version(
+    media_type: str,
+    component: str,
+    version: str,
+    path: str,
+    root: str = ARTIFACTS_PATH,
+    **info,
+):
+    """
+    Point the manifest at a fully written version directory.
+
+    The manifest is rewritten to a temp file and os.replace'd, so serving
+    processes see either the previous manifest or the new one, never a
+    partial write.
+    """
+    manifest_path = os.path.join(root, "manifest.json")
+
+    with _manifest_lock(root):
+        manifest = read_manifest(root)
+
+        manifest.setdefault(media_type, {})[component] = {
+            "version": version,
+            "path": os.path.relpath(path, root),
+            "published_at": datetime.utcnow().isoformat(),
+            **info,
+        }
+
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, manifest_path)
+
+    _prune_versions(media_type, component, root)
+
+
+def _prune_versions(media_type: str, component: str, root: str = ARTIFACTS_PATH):
+    # workers still mapping a removed version keep their pages until they reload
+    versions_path = os.path.join(root, "versions")
+    prefix = f"{media_type}-{component}-"
+    versions = sorted(d for d in os.listdir(versions_path) if d.startswith(prefix))
+
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(versions_path, name), ignore_errors=True)
+
+
+# --- LOADED ARTIFACTS ---
+class ArtifactSet:
+    """
+    Immutable snapshot of the serving artifacts of one media type.
+
+    Readers grab one set per request and use it throughout; a reload
+    builds a new set and swaps the reference, so a request never mixes
+    two versions.
+    """
+
+    def __init__(
+        self,
+        media_type: str,
+        versions: Dict[str, Optional[str]],
+        matrix,
+        index_to_tmdb: np.ndarray,
+        tmdb_to_index: Dict[int, int],
+        row_lookup: RowLookup,
+        neighbors: Optional[Tuple[np.ndarray, np.ndarray]],
+        neighbor_table,
+        embeddings: Optional[np.ndarray],
+        embedding_index: Optional[EmbeddingIndex],
+        profile_scorer: ProfileScorer,
+        delta: DeltaIndex,
+        collab: Optional[Dict[int, list]],
+        als: Optional[ALSModel] = None,
+    ):
+        self.media_type = media_type
+        self.versions = versions
+
+        self.matrix = matrix
+        self.index_to_tmdb = index_to_tmdb
+        self.tmdb_to_index = tmdb_to_index
+        self.row_lookup = row_lookup
+        self.neighbors = neighbors
+        self.neighbor_table = neighbor_table
+        self.embeddings = embeddings
+        self.embedding_index = embedding_index
+        self.profile_scorer = profile_scorer
+        self.delta = delta
+        self.collab = collab
+        self.als = als
+
+        self.loaded_at = time.time()
+
+    @property
+    def content_model(self):
+        """
+        What content similarity is served from in this deployment
+        """
+        if CONTENT_SIMILARITY_MODE == "dense" and self.embedding_index is not None:
+            return self.embedding_index
+        if CONTENT_SIMILARITY_MODE == "neighbors":
+            return self.neighbor_table
+        return self.profile_scorer
+
+    def memory(self) -> Dict[str, int]:
+        """
+        Approximate footprint: memory-mapped bytes (shared by every worker
+        through the page cache) and private heap bytes of this process
+        """
+        arrays = [
+            self.matrix.data,
+            self.matrix.indices,
+            self.matrix.indptr,
+            self.index_to_tmdb,
+            *(self.neighbors or ()),
+        ]
+        if self.embeddings is not None:
+            arrays.append(self.embeddings)
+        if self.als is not None:
+            arrays += [self.als.item_ids, self.als.item_factors, self.als.user_factors]
+
+        mapped = sum(a.nbytes for a in arrays if _is_mapped(a))
+        heap = sum(a.nbytes for a in arrays if not _is_mapped(a))
+
+        heap += _approx_size(self.tmdb_to_index)
+        heap += self.row_lookup.nbytes
+        heap += self.delta.nbytes
+        if isinstance(self.neighbor_table, dict):
+            heap += _approx_size(self.neighbor_table)
+        if self.collab is not None:
+            heap += _approx_size(self.collab)
+
+        return {"mapped_bytes": int(mapped), "heap_bytes": int(heap)}
+
+
+def _is_mapped(array: np.ndarray) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def _approx_size(mapping: Dict) -> int:
+    """
+    Shallow size of a dict plus its list-of-tuples values
+    """
+    size = sys.getsizeof(mapping)
+
+    for value in mapping.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(v) for v in value)
+
+    return size
+
+
+def _load_content(media_type: str, entry: Optional[Dict[str, Any]]):
+    directory = os.path.join(ARTIFACTS_PATH, entry["path"]) if entry else ARTIFACTS_PATH
+
+    matrix = load_tfidf_matrix(media_type, directory)
+    index_to_tmdb = load_index_to_tmdb(media_type, directory)
+    tmdb_to_index = build_row_index(index_to_tmdb)
+    neighbors = load_neighbors(media_type, directory)
+
+    embeddings = load_embeddings(media_type, directory)
+    embedding_index = None
+    if embeddings is not None:
+        # aggregate as many neighbors per item as the precomputed lists hold
+        k = neighbors[0].shape[1] if neighbors is not None else (entry or {}).get("top_k", 20)
+        embedding_index = EmbeddingIndex(tmdb_to_index, index_to_tmdb, embeddings, k)
+
+    return {
+        "matrix": matrix,
+        "index_to_tmdb": index_to_tmdb,
+        "tmdb_to_index": tmdb_to_index,
+        "row_lookup": RowLookup(index_to_tmdb),
+        "neighbors": neighbors,
+        "neighbor_table": load_neighbor_table(media_type, tmdb_to_index, directory),
+        "embeddings": embeddings,
+        "embedding_index": embedding_index,
+        "profile_scorer": ProfileScorer(matrix, index_to_tmdb, tmdb_to_index),
+        # titles seeded after this version was built
+        "delta": DeltaIndex(media_type, directory, matrix, index_to_tmdb, tmdb_to_index),
+    }
+
+
+def _load_collab(media_type: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[int, list]]:
+    if entry:
+        path = os.path.join(ARTIFACTS_PATH, entry["path"], "collab.pkl")
+    else:
+        path = os.path.join(MODELS_PATH, f"{media_type}_collab.pkl")
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_als(entry: Optional[Dict[str, Any]]) -> Optional[ALSModel]:
+    # no pre-registry layout: the engine exists only once published
+    if not entry:
+        return None
+
+    signals_at = entry.get("signals_at")
+
+    return load_als_model(
+        os.path.join(ARTIFACTS_PATH, entry["path"]),
+        entry["regularization"],
+        entry["alpha"],
+        datetime.fromisoformat(signals_at) if signals_at else None,
+    )
+
+
+def _entry_version(entry: Optional[Dict[str, Any]]) -> str:
+    return entry["version"] if entry else LEGACY_VERSION
+
+
+def _load_set(media_type: str, entries: Dict[str, Any], previous: Optional[ArtifactSet]) -> ArtifactSet:
+    """
+    Load one media type, reusing the components of `previous` whose
+    version did not change
+    """
+    content_entry = entries.get("content")
+    collab_entry = entries.get("collab")
+    als_entry = entries.get("als")
+
+    versions = {
+        "content": _entry_version(content_entry),
+        "collab": _entry_version(collab_entry),
+        "als": als_entry["version"] if als_entry else None,
+    }
+
+    if previous is not None and previous.versions["content"] == versions["content"]:
+        content = {
+            "matrix": previous.matrix,
+            "index_to_tmdb": previous.index_to_tmdb,
+            "tmdb_to_index": previous.tmdb_to_index,
+            "row_lookup": previous.row_lookup,
+            "neighbors": previous.neighbors,
+            "neighbor_table": previous.neighbor_table,
+            "embeddings": previous.embeddings,
+            "embedding_index": previous.embedding_index,
+            "profile_scorer": previous.profile_scorer,
+            "delta": previous.delta,
+        }
+    else:
+        content = _load_content(media_type, content_entry)
+
+    if previous is not None and previous.versions["collab"] == versions["collab"]:
+        collab = previous.collab
+    else:
+        collab = _load_collab(media_type, collab_entry)
+
+    if previous is not None and previous.versions.get("als") == versions["als"]:
+        als = previous.als
+    else:
+        als = _load_als(als_entry)
+
+    return ArtifactSet(media_type, versions, collab=collab, als=als, **content)
+
+
+# --- REGISTRY ---
+class ArtifactRegistry:
+    """
+    Owns every recommender artifact of the process.
+
+    The manifest is checked at most every `poll_seconds`; when a build has
+    published a new version it is loaded next to the current one and
+    swapped in atomically, so rebuilds reach traffic without a restart.
+    """
+
+    def __init__(self, poll_seconds: float = ARTIFACT_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+
+        self._sets: Dict[str, ArtifactSet] = {}
+        self._manifest_stamp = None
+        self._checked_at = 0.0
+
+        self._load_lock = threading.RLock()
+        self._listeners: List[Callable[[], None]] = []
+
+        self._collab_modes: Dict[str, str] = {}
+
+    def get(self, media_type: str) -> ArtifactSet:
+        self._maybe_reload()
+        return self._sets[media_type]
+
+    def on_swap(self, callback: Callable[[], None]):
+        """
+        Run `callback` after a new version replaced the loaded one
+        """
+        self._listeners.append(callback)
+
+    def _maybe_reload(self):
+        if not self._sets:
+            # first use loads synchronously; failures propagate to the caller
+            with self._load_lock:
+                if not self._sets:
+                    self.reload()
+            return
+
+        if time.time() - self._checked_at < self.poll_seconds:
+            return
+
+        # one thread checks; the rest keep serving the current set
+        if not self._load_lock.acquire(blocking=False):
+            return
+
+        try:
+            self._checked_at = time.time()
+            if _manifest_stamp() != self._manifest_stamp:
+                self.reload()
+        except Exception:
+            # keep serving the previous version if the new one fails to load
+            traceback.print_exc()
+        finally:
+            self._load_lock.release()
+
+    def reload(self):
+        with self._load_lock:
+            stamp = _manifest_stamp()
+            manifest = read_manifest()
+
+            # remember the stamp first so a broken version is not retried every poll
+            self._manifest_stamp = stamp
+            self._checked_at = time.time()
+
+            previous = self._sets
+            sets = {
+                media_type: _load_set(media_type, manifest.get(media_type, {}), previous.get(media_type))
+                for media_type in MEDIA_TYPES
+            }
+
+            # single reference assignment: readers see the old or the new dict
+            self._sets = sets
+
+            changed = previous and any(
+                previous[m].versions != sets[m].versions for m in MEDIA_TYPES
+            )
+
+        # auto mode switches silently when an item-item artifact appears
+        collab_modes = {media_type: collab_mode(s) for media_type, s in sets.items()}
+        if collab_modes != self._collab_modes:
+            self._collab_modes = collab_modes
+            print(f"Collaborative filtering mode (COLLAB_MODE={COLLAB_MODE}): {collab_modes}")
+
+        if changed:
+            print(f"Recommender artifacts reloaded: {self.versions()}")
+            for callback in self._listeners:
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
+
+    def versions(self) -> Dict[str, Dict[str, Optional[str]]]:
+        return {media_type: s.versions for media_type, s in self._sets.items()}
+
+    def status(self) -> Dict[str, Any]:
+        self._maybe_reload()
+
+        return {
+            media_type: {
+                "versions": s.versions,
+                "loaded_at": datetime.utcfromtimestamp(s.loaded_at).isoformat(),
+                "items": len(s.index_to_tmdb),
+                "content_mode": _content_mode(s.content_model),
+                "collab_mode": collab_mode(s),
+                "embedding_dims": s.embedding_index.dims if s.embedding_index is not None else None,
+                "memory": s.memory(),
+                "profile_cache": s.profile_scorer.stats(),
+                "delta": s.delta.stats(),
+            }
+            for media_type, s in self._sets.items()
+        }
+
+
+def _content_mode(model) -> str:
+    if isinstance(model, EmbeddingIndex):
+        return "dense"
+    if isinstance(model, ProfileScorer):
+        return "profile"
+    return "neighbors"
+
+
+def collab_mode(artifacts: ArtifactSet) -> str:
+    """
+    Which collaborative source serves a media type: "item" neighbors or the
+    live "user" matrix
+    """
+    if artifacts.collab is not None and COLLAB_MODE in ("auto", "item"):
+        return "item"
+    return "user"
+
+
+def _manifest_stamp():
+    try:
+        return os.stat(MANIFEST_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+artifact_registry = ArtifactRegistry()
@@ -0,0 +1,266 @@
+from app.db import movies_collection, tv_collection
+from app.services.generation import current_catalog_generation
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import threading
+import traceback
+import base64
+import json
+import time
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+SORT_FIELDS = ("rating", "popularity", "year")
+DEFAULT_SORT = "rating"
+
+# rating lists only show titles with more votes than this
+VOTE_CUTOFFS = {"movie": 2000, "tv": 500}
+
+
+def _collection(media_type: str):
+    return movies_collection if media_type == "movie" else tv_collection
+
+
+def _numbers(docs: List[Dict[str, Any]], field: str) -> np.ndarray:
+    values = [doc.get(field) for doc in docs]
+    return np.array(
+        [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values],
+        dtype=np.float64
+    )
+
+
+def _sort_key(value, tmdb_id: int) -> Tuple[int, float, int]:
+    """
+    Ascending key of a title in a list order: value descending, missing
+    values last, ties by tmdb_id
+    """
+    if value is None:
+        return 1, 0.0, tmdb_id
+    return 0, -float(value), tmdb_id
+
+
+def encode_cursor(sort: str, doc: Dict[str, Any]) -> str:
+    """
+    Opaque cursor pointing just past `doc` in the `sort` order
+    """
+    value = doc.get(sort)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        value = None
+
+    raw = json.dumps([sort, value, doc["tmdb_id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[int, float, int]:
+    """
+    Sort key stored in a cursor; ValueError when it is malformed or was
+    issued for another sort order
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, tmdb_id = json.loads(raw)
+        key = _sort_key(value, int(tmdb_id))
+    except Exception:
+        raise ValueError("invalid cursor")
+
+    if cursor_sort != sort:
+        raise ValueError("cursor belongs to another sort order")
+
+    return key
+
+
+class _Catalog:
+    def __init__(self, generation: int, docs: List[Dict[str, Any]], orders: Dict[str, np.ndarray], keys: Dict[str, List[Tuple[int, float, int]]], genres: Dict[str, np.ndarray], ranks: Dict[Tuple[str, str], np.ndarray], seconds: float):
+        self.generation = generation
+        self.docs = docs
+        self.orders = orders
+        self.keys = keys
+        self.genres = genres
+        self.ranks = ranks
+        self.genre_names = sorted(genres)
+        self.seconds = seconds
+        self.built_at = time.time()
+
+
+class CatalogIndex:
+    """
+    Read-through copy of each catalog collection for the list endpoints.
+
+    Per media type it keeps the documents, one array of positions per sort
+    key in list order (value descending, missing values last, ties by
+    tmdb_id; the rating order already has the vote cutoff applied), a
+    boolean mask per genre and, per sort/genre pair, the places in the sort
+    array that are in the genre. A page is a slice instead of
+    find/sort/skip plus a count, and totals are counted once per build.
+
+    Cursor pages find their start by bisecting the sort keys, so the
+    200th page costs what the first does and a reseed between two
+    requests does not shift or repeat titles.
+
+    Rebuilt in the background and swapped in whole when a reseed moves the
+    catalog generation; requests keep the previous copy until then.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._media: Dict[str, _Catalog] = {}
+        self._rebuilding = set()
+
+    # --- BUILD ---
+    def rebuild(self, media_type: str) -> _Catalog:
+        started = time.perf_counter()
+        generation = current_catalog_generation()
+
+        docs = list(_collection(media_type).find({}, {"_id": 0}))
+
+        tmdb_ids = np.array([doc.get("tmdb_id") or 0 for doc in docs], dtype=np.int64)
+        votes = _numbers(docs, "votes")
+
+        orders, keys = {}, {}
+        for field in SORT_FIELDS:
+            values = _numbers(docs, field)
+            missing = np.isnan(values)
+
+            # same order as .sort([(field, -1), ("tmdb_id", 1)])
+            order = np.lexsort((tmdb_ids, -np.nan_to_num(values), missing))
+
+            if field == "rating":
+                order = order[votes[order] > VOTE_CUTOFFS[media_type]]
+
+            orders[field] = order.astype(np.int32)
+            keys[field] = [
+                _sort_key(None if missing[p] else values[p], int(tmdb_ids[p]))
+                for p in order
+            ]
+
+        genres: Dict[str, np.ndarray] = {}
+        for position, doc in enumerate(docs):
+            for genre in doc.get("genres") or ():
+                if genre not in genres:
+                    genres[genre] = np.zeros(len(docs), dtype=bool)
+                genres[genre][position] = True
+
+        ranks = {
+            (field, genre): np.flatnonzero(mask[order]).astype(np.int32)
+            for field, order in orders.items()
+            for genre, mask in genres.items()
+        }
+
+        catalog = _Catalog(generation, docs, orders, keys, genres, ranks, time.perf_counter() - started)
+
+        with self._lock:
+            self._media[media_type] = catalog
+
+        return catalog
+
+    def _rebuild_in_background(self, media_type: str):
+        try:
+            self.rebuild(media_type)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._rebuilding.discard(media_type)
+
+    def warm(self):
+        """
+        Load every media type up front (app startup)
+        """
+        for media_type in MEDIA_TYPES:
+            try:
+                self.rebuild(media_type)
+            except Exception:
+                traceback.print_exc()
+
+    def _current(self, media_type: str) -> _Catalog:
+        with self._lock:
+            catalog = self._media.get(media_type)
+
+            # after a reseed keep serving the old copy until the new one exists
+            stale = catalog is not None and catalog.generation != current_catalog_generation()
+            if stale and media_type not in self._rebuilding:
+                self._rebuilding.add(media_type)
+                threading.Thread(
+                    target=self._rebuild_in_background,
+                    args=(media_type,),
+                    daemon=True
+                ).start()
+
+        if catalog is None:
+            return self.rebuild(media_type)
+
+        return catalog
+
+    # --- SERVING ---
+    def _ranks(self, catalog: _Catalog, sort: str, genre: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Places in the sort array that are in `genre`; None means all of them
+        """
+        if not genre:
+            return None
+        return catalog.ranks.get((sort, genre), np.zeros(0, dtype=np.int32))
+
+    def page(self, media_type: str, sort: str = DEFAULT_SORT, genre: Optional[str] = None, skip: int = 0, limit: int = 10) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of the list in `sort` order, optionally one genre only,
+        and the total number of matching titles
+        """
+        catalog = self._current(media_type)
+
+        order = catalog.orders[sort]
+        ranks = self._ranks(catalog, sort, genre)
+        total = len(order) if ranks is None else len(ranks)
+
+        skip = max(skip, 0)
+        end = skip + limit if limit > 0 else total
+
+        positions = order[skip:end] if ranks is None else order[ranks[skip:end]]
+
+        return [catalog.docs[p] for p in positions], total
+
+    def page_after(self, media_type: str, sort: str = DEFAULT_SORT, genre: Optional[str] = None, cursor: Optional[str] = None, limit: int = 10) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+        """
+        Keyset page: the titles after `cursor` (from the start when empty),
+        the total, and the cursor of the next page (None at the end)
+        """
+        catalog = self._current(media_type)
+
+        order = catalog.orders[sort]
+        ranks = self._ranks(catalog, sort, genre)
+        total = len(order) if ranks is None else len(ranks)
+
+        start = 0
+        if cursor:
+            start = bisect_right(catalog.keys[sort], decode_cursor(cursor, sort))
+            if ranks is not None:
+                start = int(np.searchsorted(ranks, start))
+
+        end = start + limit if limit > 0 else total
+
+        positions = order[start:end] if ranks is None else order[ranks[start:end]]
+        docs = [catalog.docs[p] for p in positions]
+
+        next_cursor = encode_cursor(sort, docs[-1]) if docs and end < total else None
+
+        return docs, total, next_cursor
+
+    def genres(self, media_type: str) -> List[str]:
+        return self._current(media_type).genre_names
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                media_type: {
+                    "generation": catalog.generation,
+                    "titles": len(catalog.docs),
+                    "genres": len(catalog.genres),
+                    "build_seconds": round(catalog.seconds, 3),
+                    "built_at": catalog.built_at,
+                }
+                for media_type, catalog in self._media.items()
+            }
+
+
+catalog_index = CatalogIndex()
@@ -0,0 +1,311 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+import joblib
+import pickle
+import json
+import re
+import os
+
+
+# --- PATHS ---
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+# overridable to serve a tree written by `build_recommender.py --output-dir`
+ARTIFACTS_PATH = os.getenv("ARTIFACTS_PATH", os.path.join(PROJECT_ROOT, "artifacts"))
+MODELS_PATH = os.path.join(PROJECT_ROOT, "models")
+# "profile":   user content scores from one sparse mat-vec against the
+#              weighted list profile; detail pages use the precomputed
+#              top-K arrays (sparse TF-IDF product as fallback)
+# "neighbors": user content scores summed from the precomputed top-K lists
+# "dense":     live BLAS products over the SVD embeddings, when the published
+#              version has them (`build_recommender.py content --embedding-dims N`)
+CONTENT_SIMILARITY_MODE = os.getenv("CONTENT_SIMILARITY_MODE", "profile")
+
+# file name stems written by `scripts/build_recommender.py content`
+ARTIFACT_NAMES = {
+    "movie": {
+        "matrix": "tfidf_matrix",
+        "vectorizer": "tfidf_vectorizer",
+        "ids": "tfidf_index_to_tmdb",
+        "hashes": "tfidf_content_hashes",
+        "neighbors": "tfidf_neighbor",
+        "embeddings": "tfidf_embeddings",
+        "svd": "tfidf_svd",
+        "model": "movie_tfidf.pkl",
+    },
+    "tv": {
+        "matrix": "tv_tfidf_matrix",
+        "vectorizer": "tv_vectorizer",
+        "ids": "tv_index_to_tmdb",
+        "hashes": "tv_content_hashes",
+        "neighbors": "tv_neighbor",
+        "embeddings": "tv_embeddings",
+        "svd": "tv_svd",
+        "model": "tv_tfidf.pkl",
+    },
+}
+
+
+# title field of each media type's catalog documents
+TITLE_FIELDS = {"movie": "title", "tv": "name"}
+
+
+# --- DOCUMENTS ---
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+    text = re.sub(r"[^a-zA-Z0-9\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def content_document(doc: Dict[str, Any], title_field: str) -> str:
+    """
+    TF-IDF input text of one catalog document; the build and the serving
+    fold-in must produce exactly the same text
+    """
+    genres = " ".join(doc.get("genres", []) or [])
+
+    # genres twice so they outweigh incidental overview words
+    return " ".join(
+        [
+            clean_text(doc.get(title_field, "")),
+            clean_text(doc.get("overview", "")),
+            genres,
+            genres,
+        ]
+    )
+
+
+# --- FLAT ARRAYS ---
+def _mmap(name: str, directory: str = ARTIFACTS_PATH) -> Optional[np.ndarray]:
+    """
+    Open <directory>/<name>.npy read-only and memory-mapped, so every worker
+    process shares the same page-cache copy instead of a private one
+    """
+    path = os.path.join(directory, f"{name}.npy")
+    if not os.path.exists(path):
+        return None
+
+    return np.load(path, mmap_mode="r")
+
+
+def load_tfidf_matrix(media_type: str, directory: str = ARTIFACTS_PATH) -> sp.csr_matrix:
+    """
+    L2-normalized TF-IDF matrix, one row per item.
+
+    Memory-mapped from the flat CSR arrays when present, otherwise
+    unpickled from the legacy joblib dump.
+    """
+    stem = ARTIFACT_NAMES[media_type]["matrix"]
+
+    parts = [_mmap(f"{stem}_{part}", directory) for part in ("data", "indices", "indptr", "shape")]
+    if all(part is not None for part in parts):
+        data, indices, indptr, shape = parts
+        return sp.csr_matrix((data, indices, indptr), shape=tuple(int(n) for n in shape), copy=False)
+
+    from sklearn.preprocessing import normalize
+
+    matrix = joblib.load(os.path.join(directory, f"{stem}.joblib"))
+    return normalize(matrix).tocsr()
+
+
+def load_index_to_tmdb(media_type: str, directory: str = ARTIFACTS_PATH) -> np.ndarray:
+    """
+    Row -> tmdb_id table (int32)
+    """
+    stem = ARTIFACT_NAMES[media_type]["ids"]
+
+    ids = _mmap(stem, directory)
+    if ids is not None:
+        return ids
+
+    with open(os.path.join(directory, f"{stem}.json")) as f:
+        return np.asarray(json.load(f), dtype=np.int32)
+
+
+def build_row_index(index_to_tmdb: np.ndarray) -> Dict[int, int]:
+    return {tmdb_id: row for row, tmdb_id in enumerate(index_to_tmdb.tolist())}
+
+
+class RowLookup:
+    """
+    Vectorized tmdb_id -> catalog row mapping through a direct-address
+    table (TMDB ids are small positive ints), -1 outside the catalog
+    """
+
+    def __init__(self, index_to_tmdb: np.ndarray):
+        ids = np.asarray(index_to_tmdb, dtype=np.int64)
+
+        self.index_to_tmdb = index_to_tmdb
+        self.size = len(ids)
+
+        self._table = np.full(int(ids.max()) + 1 if len(ids) else 0, -1, dtype=np.int32)
+        self._table[ids] = np.arange(len(ids), dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self._table.nbytes
+
+    def rows(self, tmdb_ids: np.ndarray) -> np.ndarray:
+        rows = np.full(len(tmdb_ids), -1, dtype=np.int64)
+
+        inside = (tmdb_ids >= 0) & (tmdb_ids < len(self._table))
+        rows[inside] = self._table[tmdb_ids[inside]]
+
+        return rows
+
+
+def load_neighbors(media_type: str, directory: str = ARTIFACTS_PATH) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Precomputed top-K neighbors: (n_items, K) tmdb ids (-1 padded) and
+    float32 cosine scores, best first. None when not built yet.
+    """
+    stem = ARTIFACT_NAMES[media_type]["neighbors"]
+
+    ids = _mmap(f"{stem}_ids", directory)
+    scores = _mmap(f"{stem}_scores", directory)
+
+    if ids is None or scores is None:
+        return None
+
+    return ids, scores
+
+
+def load_vectorizer(media_type: str, directory: str = ARTIFACTS_PATH):
+    """
+    The fitted TfidfVectorizer of a content version, or None
+    """
+    path = os.path.join(directory, f"{ARTIFACT_NAMES[media_type]['vectorizer']}.joblib")
+    if not os.path.exists(path):
+        return None
+
+    return joblib.load(path)
+
+
+def load_embeddings(media_type: str, directory: str = ARTIFACTS_PATH) -> Optional[np.ndarray]:
+    """
+    (n_items, dims) L2-normalized float32 SVD embeddings, None when the
+    version was built without them
+    """
+    return _mmap(ARTIFACT_NAMES[media_type]["embeddings"], directory)
+
+
+# --- NEIGHBOR LOOKUPS ---
+class NeighborTable:
+    """
+    Read-only {tmdb_id: [(neighbor_id, score), ...]} view over the
+    memory-mapped neighbor arrays, a drop-in for the legacy pickled dict
+    """
+
+    def __init__(self, rows: Dict[int, int], ids: np.ndarray, scores: np.ndarray):
+        self._rows = rows
+        self._ids = ids
+        self._scores = scores
+
+    def get(self, tmdb_id: int, default=None) -> List[Tuple[int, float]]:
+        row = self._rows.get(tmdb_id)
+        if row is None:
+            return default
+
+        return [
+            (neighbor_id, score)
+            for neighbor_id, score in zip(self._ids[row].tolist(), self._scores[row].tolist())
+            if neighbor_id >= 0
+        ]
+
+    def __contains__(self, tmdb_id: int) -> bool:
+        return tmdb_id in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def load_neighbor_table(media_type: str, rows: Dict[int, int], directory: str = ARTIFACTS_PATH):
+    """
+    NeighborTable over the flat arrays, or the legacy pickled dict
+    """
+    neighbors = load_neighbors(media_type, directory)
+    if neighbors is not None:
+        return NeighborTable(rows, *neighbors)
+
+    with open(os.path.join(MODELS_PATH, ARTIFACT_NAMES[media_type]["model"]), "rb") as f:
+        return pickle.load(f)
+
+
+class EmbeddingIndex:
+    """
+    Live cosine neighbors over the dense embeddings: one matrix-vector
+    (or matrix-matrix) product per query instead of precomputed lists.
+    Same .get() as NeighborTable.
+    """
+
+    def __init__(self, rows: Dict[int, int], index_to_tmdb: np.ndarray, embeddings: np.ndarray, k: int):
+        self._rows = rows
+        self._ids = index_to_tmdb
+        self._embeddings = embeddings
+        self.k = k
+
+    @property
+    def dims(self) -> int:
+        return self._embeddings.shape[1]
+
+    def _top(self, similarities: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Column indices and scores of the `limit` best entries of each row,
+        best first
+        """
+        limit = min(limit, similarities.shape[1] - 1)
+        if limit <= 0:
+            empty = np.empty((len(similarities), 0))
+            return empty.astype(np.int64), empty
+
+        top = np.argpartition(-similarities, limit - 1, axis=1)[:, :limit]
+        values = np.take_along_axis(similarities, top, axis=1)
+
+        order = np.argsort(-values, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+    def similar(self, tmdb_id: int, limit: int) -> Dict[int, float]:
+        row = self._rows.get(tmdb_id)
+        if row is None:
+            return {}
+
+        similarities = (self._embeddings @ self._embeddings[row])[None, :]
+
+        # exclude itself
+        similarities[0, row] = -np.inf
+
+        top, values = self._top(similarities, limit)
+
+        return {int(self._ids[i]): float(v) for i, v in zip(top[0], values[0])}
+
+    def get(self, tmdb_id: int, default=None) -> List[Tuple[int, float]]:
+        if tmdb_id not in self._rows:
+            return default
+
+        return list(self.similar(tmdb_id, self.k).items())
+
+    def aggregate(self, tmdb_ids: List[int]) -> Dict[int, float]:
+        """
+        Sum of the top-k neighbor scores of every item in `tmdb_ids`,
+        computed with a single matrix product
+        """
+        rows = np.asarray([self._rows[t] for t in tmdb_ids if t in self._rows], dtype=np.int64)
+        if not len(rows):
+            return {}
+
+        similarities = self._embeddings[rows] @ self._embeddings.T
+        similarities[np.arange(len(rows)), rows] = -np.inf
+
+        top, values = self._top(similarities, self.k)
+
+        totals = np.bincount(top.ravel(), weights=values.ravel(), minlength=len(self._ids))
+        hit = np.unique(top)
+
+        return {int(self._ids[i]): float(totals[i]) for i in hit}
+
+    def __contains__(self, tmdb_id: int) -> bool:
+        return tmdb_id in self._rows
+
+    def __len__(self):
+        return len(self._rows)
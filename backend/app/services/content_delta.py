@@ -0,0 +1,197 @@
+from app.db import movies_collection, tv_collection
+from app.services.content_artifacts import TITLE_FIELDS, content_document, load_vectorizer
+from typing import Any, Dict, List, Optional
+from sklearn.preprocessing import normalize
+import numpy as np
+import scipy.sparse as sp
+import threading
+import traceback
+import time
+import os
+
+
+# titles folded in per content version; past this a rebuild is overdue
+DELTA_MAX_ITEMS = int(os.getenv("CONTENT_DELTA_MAX_ITEMS", 2000))
+
+# ids that were not found in the catalog are not looked up again for this long
+DELTA_MISS_TTL_SECONDS = int(os.getenv("CONTENT_DELTA_MISS_TTL", 5 * 60))
+DELTA_MAX_MISSES = 10000
+
+
+def _collection(media_type: str):
+    return movies_collection if media_type == "movie" else tv_collection
+
+
+def _top(scores: np.ndarray, ids: np.ndarray, limit: int) -> Dict[int, float]:
+    limit = min(limit, len(scores))
+    if limit <= 0:
+        return {}
+
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[scores[top] > 0]
+
+    return {int(ids[i]): float(scores[i]) for i in top}
+
+
+class DeltaIndex:
+    """
+    TF-IDF rows for catalog titles the loaded content version does not
+    index yet (seeded after the last build), vectorized on first request
+    with that version's own vectorizer and queried next to the main
+    matrix.
+
+    It lives as long as its artifact set: the next content build indexes
+    these titles and the swap starts a fresh, empty delta.
+    """
+
+    def __init__(self, media_type: str, directory: str, matrix: sp.csr_matrix, index_to_tmdb: np.ndarray, tmdb_to_index: Dict[int, int]):
+        self.media_type = media_type
+        self._directory = directory
+        self._matrix = matrix
+        self._ids = index_to_tmdb
+        self._rows = tmdb_to_index
+
+        self._lock = threading.Lock()
+        self._vectorizer = None
+
+        self._delta_rows: Dict[int, int] = {}
+        self._delta_ids: List[int] = []
+        self._vectors: List[sp.csr_matrix] = []
+        self._stacked: Optional[sp.csr_matrix] = None
+
+        # tmdb_id -> when it was last looked up and not found
+        self._misses: Dict[int, float] = {}
+
+        self.full = False
+
+    # --- FOLD-IN ---
+    def vectorizer(self):
+        """
+        The content version's fitted TfidfVectorizer, loaded on first use
+        (also serves semantic search)
+        """
+        with self._lock:
+            if self._vectorizer is None:
+                self._vectorizer = load_vectorizer(self.media_type, self._directory)
+            return self._vectorizer
+
+    def _fold_in(self, tmdb_id: int) -> Optional[sp.csr_matrix]:
+        missed_at = self._misses.get(tmdb_id)
+        if missed_at is not None and time.time() - missed_at < DELTA_MISS_TTL_SECONDS:
+            return None
+
+        if len(self._delta_ids) >= DELTA_MAX_ITEMS:
+            self.full = True
+            return None
+
+        title_field = TITLE_FIELDS[self.media_type]
+        doc = _collection(self.media_type).find_one(
+            {"tmdb_id": tmdb_id},
+            {"_id": 0, "tmdb_id": 1, title_field: 1, "overview": 1, "genres": 1}
+        )
+
+        vectorizer = self.vectorizer() if doc else None
+        if vectorizer is None:
+            self._miss(tmdb_id)
+            return None
+
+        vector = normalize(vectorizer.transform([content_document(doc, title_field)])).tocsr()
+
+        with self._lock:
+            if tmdb_id not in self._delta_rows:
+                self._delta_rows[tmdb_id] = len(self._delta_ids)
+                self._delta_ids.append(tmdb_id)
+                self._vectors.append(vector)
+                self._stacked = None
+                self._misses.pop(tmdb_id, None)
+
+            return self._vectors[self._delta_rows[tmdb_id]]
+
+    def _miss(self, tmdb_id: int):
+        now = time.time()
+
+        with self._lock:
+            if len(self._misses) >= DELTA_MAX_MISSES:
+                self._misses = {
+                    t: at for t, at in self._misses.items()
+                    if now - at < DELTA_MISS_TTL_SECONDS
+                }
+                if len(self._misses) >= DELTA_MAX_MISSES:
+                    self._misses.clear()
+
+            self._misses[tmdb_id] = now
+
+    def vector(self, tmdb_id: int) -> Optional[sp.csr_matrix]:
+        """
+        L2-normalized TF-IDF row of an id the main matrix lacks, folded in
+        from its catalog document on first use
+        """
+        row = self._delta_rows.get(tmdb_id)
+        if row is not None:
+            return self._vectors[row]
+
+        if tmdb_id in self._rows:
+            return None
+
+        try:
+            return self._fold_in(tmdb_id)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def _delta_matrix(self):
+        with self._lock:
+            if self._stacked is None and self._vectors:
+                self._stacked = sp.vstack(self._vectors).tocsr()
+            return self._stacked, np.asarray(self._delta_ids, dtype=np.int64)
+
+    # --- QUERIES ---
+    def similar(self, tmdb_id: int, limit: int) -> Dict[int, float]:
+        """
+        Top `limit` cosines of a folded-in id against the main matrix and
+        the other delta rows, {tmdb_id: score}, best first
+        """
+        vector = self.vector(tmdb_id)
+        if vector is None:
+            return {}
+
+        scores = _top((self._matrix @ vector.T).toarray().ravel(), self._ids, limit)
+        scores = self.extend(vector, scores, limit, exclude=tmdb_id)
+
+        return dict(sorted(scores.items(), key=lambda kv: -kv[1]))
+
+    def extend(self, vector: sp.csr_matrix, scores: Dict[int, float], limit: int, exclude: Optional[int] = None) -> Dict[int, float]:
+        """
+        Merge delta rows into a main-index result so fresh titles show up
+        next to indexed ones
+        """
+        stacked, ids = self._delta_matrix()
+        if stacked is None:
+            return scores
+
+        delta = (stacked @ vector.T).toarray().ravel()
+        if exclude is not None:
+            delta[ids == exclude] = 0
+
+        merged = dict(scores)
+        merged.update(_top(delta, ids, limit))
+
+        best = sorted(merged.items(), key=lambda kv: -kv[1])[:limit]
+        return dict(best)
+
+    def __len__(self):
+        return len(self._delta_ids)
+
+    def __contains__(self, tmdb_id):
+        return tmdb_id in self._delta_rows
+
+    @property
+    def nbytes(self) -> int:
+        return sum(v.data.nbytes + v.indices.nbytes + v.indptr.nbytes for v in self._vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._delta_ids),
+            "max_items": DELTA_MAX_ITEMS,
+            "full": self.full,
+        }
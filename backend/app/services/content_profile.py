@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+import threading
+import os
+
+
+# candidates returned per user
+PROFILE_TOP_K = int(os.getenv("CONTENT_PROFILE_TOP_K", 200))
+
+# users whose profile vector is kept, per media type
+PROFILE_CACHE_SIZE = int(os.getenv("CONTENT_PROFILE_CACHE_SIZE", 5000))
+
+
+class ProfileScorer:
+    """
+    "More like my list" content scores over the whole catalog.
+
+    A user's profile is the interaction-weighted sum of their items' rows
+    in the L2-normalized TF-IDF matrix, so one sparse mat-vec gives every
+    item sum_i w_i * cos(item, i). Profiles are cached per user and patched
+    with only the rows added, removed or re-weighted since the last call.
+    """
+
+    def __init__(
+        self,
+        matrix: sp.csr_matrix,
+        index_to_tmdb: np.ndarray,
+        tmdb_to_index: Dict[int, int],
+        top_k: int = PROFILE_TOP_K,
+        cache_size: int = PROFILE_CACHE_SIZE,
+    ):
+        self._matrix = matrix
+        self._ids = index_to_tmdb
+        self._rows = tmdb_to_index
+        self.top_k = top_k
+        self.cache_size = cache_size
+
+        self._lock = threading.Lock()
+        # user -> (weights the profile was built from, 1 x n_features profile)
+        self._profiles: "OrderedDict[Hashable, Tuple[Dict[int, float], sp.csr_matrix]]" = OrderedDict()
+
+        self.hits = 0
+        self.updates = 0
+        self.builds = 0
+
+    # --- PROFILES ---
+    def _combine(self, weights: Dict[int, float]) -> sp.csr_matrix:
+        """
+        sum_i w_i * row_i as a single (1 x n_items) @ (n_items x n_features) product
+        """
+        rows, coeffs = [], []
+        for tmdb_id, weight in weights.items():
+            row = self._rows.get(tmdb_id)
+            if row is not None and weight:
+                rows.append(row)
+                coeffs.append(weight)
+
+        selector = sp.csr_matrix(
+            (np.asarray(coeffs, dtype=np.float64), (np.zeros(len(rows), dtype=np.int64), rows)),
+            shape=(1, len(self._ids)),
+        )
+
+        return (selector @ self._matrix).tocsr()
+
+    def profile(self, weights: Dict[int, float], user_key: Optional[Hashable] = None) -> sp.csr_matrix:
+        if user_key is None:
+            return self._combine(weights)
+
+        with self._lock:
+            cached = self._profiles.get(user_key)
+
+        if cached is None:
+            profile = self._combine(weights)
+            self.builds += 1
+        else:
+            old_weights, profile = cached
+
+            delta = {}
+            for tmdb_id in old_weights.keys() | weights.keys():
+                change = weights.get(tmdb_id, 0) - old_weights.get(tmdb_id, 0)
+                if change:
+                    delta[tmdb_id] = change
+
+            if delta:
+                # new matrix object: readers holding the old one are unaffected
+                profile = profile + self._combine(delta)
+                self.updates += 1
+            else:
+                self.hits += 1
+
+        with self._lock:
+            self._profiles[user_key] = (dict(weights), profile)
+            self._profiles.move_to_end(user_key)
+
+            while len(self._profiles) > self.cache_size:
+                self._profiles.popitem(last=False)
+
+        return profile
+
+    # --- SCORING ---
+    def scores(self, weights: Dict[int, float], user_key: Optional[Hashable] = None) -> Dict[int, float]:
+        """
+        Top `top_k` catalog items for the weighted list, {tmdb_id: score},
+        excluding the list itself
+        """
+        if not weights:
+            return {}
+
+        profile = self.profile(weights, user_key)
+        if profile.nnz == 0:
+            return {}
+
+        similarities = self._matrix @ profile.toarray().ravel()
+
+        own = [self._rows[t] for t in weights if t in self._rows]
+        similarities[own] = -np.inf
+
+        k = min(self.top_k, len(similarities) - len(own))
+        if k <= 0:
+            return {}
+
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[similarities[top] > 0]
+
+        return {int(self._ids[i]): float(similarities[i]) for i in top}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "profiles": len(self._profiles),
+                "max_profiles": self.cache_size,
+                "hits": self.hits,
+                "updates": self.updates,
+                "builds": self.builds,
+            }
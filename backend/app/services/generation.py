@@ -0,0 +1,75 @@
+from app.db import meta_collection
+from pymongo import ReturnDocument
+import threading
+import time
+import os
+
+
+# The catalog generation is bumped whenever the catalog is reseeded or the
+# recommender artifacts are rebuilt. Anything derived from either (cached
+# recommendations, in-memory indexes) compares generations to know it is stale.
+GENERATION_ID = "catalog_generation"
+
+# Seeding and building run in separate processes, so the counter lives in
+# Mongo and is polled at most this often.
+GENERATION_POLL_SECONDS = float(os.getenv("GENERATION_POLL_SECONDS", 30))
+
+_lock = threading.Lock()
+_cached_value = 0
+_checked_at = 0.0
+_polling = False
+
+
+def bump_catalog_generation() -> int:
+    global _cached_value, _checked_at
+
+    doc = meta_collection.find_one_and_update(
+        {"_id": GENERATION_ID},
+        {"$inc": {"value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    with _lock:
+        _cached_value = doc["value"]
+        _checked_at = time.time()
+
+    return _cached_value
+
+
+def _poll_generation():
+    global _cached_value, _checked_at, _polling
+
+    try:
+        doc = meta_collection.find_one({"_id": GENERATION_ID}) or {}
+        value = doc.get("value", 0)
+    except Exception:
+        # keep serving the last known generation if Mongo hiccups
+        value = _cached_value
+
+    with _lock:
+        _cached_value = value
+        _checked_at = time.time()
+        _polling = False
+
+    return value
+
+
+def current_catalog_generation() -> int:
+    """
+    Last known generation. Only the first call reads Mongo inline; later
+    polls run in the background so a slow Mongo never stalls a request.
+    """
+    global _polling
+
+    with _lock:
+        if _checked_at and time.time() - _checked_at < GENERATION_POLL_SECONDS:
+            return _cached_value
+
+        if _checked_at:
+            if not _polling:
+                _polling = True
+                threading.Thread(target=_poll_generation, daemon=True).start()
+            return _cached_value
+
+    return _poll_generation()
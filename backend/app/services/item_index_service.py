@@ -0,0 +1,208 @@
+from app.db import users_collection, item_index_collection
+from pymongo import UpdateOne
+from collections import Counter
+from bson import ObjectId
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List
+import threading
+import traceback
+import time
+import os
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+# How often the background job rebuilds the index from users.my_list
+REPAIR_INTERVAL_SECONDS = int(os.getenv("ITEM_INDEX_REPAIR_INTERVAL", 6 * 60 * 60))
+
+# list writes this close before a rebuild started are replayed too, in case
+# the writing process' clock runs behind
+REPLAY_MARGIN_SECONDS = int(os.getenv("ITEM_INDEX_REPLAY_MARGIN", 5))
+
+_repair_thread = None
+_repair_lock = threading.Lock()
+
+
+# --- INCREMENTAL UPDATES ---
+def _posting_update(user_oid: ObjectId, item: Dict[str, Any], operator: str) -> UpdateOne:
+    """
+    Build an idempotent upsert that adds/removes one user from an item's
+    posting list and recomputes its count from the list itself, so replaying
+    the same event never skews the count. Updates that land while a full
+    rebuild runs are overwritten by its $out; rebuild_item_index replays
+    them afterwards.
+    """
+    return UpdateOne(
+        {"media_type": item["media_type"], "tmdb_id": item["tmdb_id"]},
+        [
+            {"$set": {"users": {operator: [{"$ifNull": ["$users", []]}, [user_oid]]}}},
+            {"$set": {"count": {"$size": "$users"}}},
+        ],
+        upsert=True,
+    )
+
+
+def _valid_items(items: Iterable[Any]) -> List[Dict[str, Any]]:
+    return [
+        item for item in items or []
+        if isinstance(item, dict) and item.get("media_type") in MEDIA_TYPES
+    ]
+
+
+def record_list_add(user_oid: ObjectId, items: Iterable[Any]):
+    items = _valid_items(items)
+    if not items:
+        return
+
+    try:
+        item_index_collection.bulk_write(
+            [_posting_update(user_oid, item, "$setUnion") for item in items],
+            ordered=False,
+        )
+    except Exception:
+        # The list write already succeeded; the repair job fixes the drift.
+        traceback.print_exc()
+
+
+def record_list_remove(user_oid: ObjectId, items: Iterable[Any]):
+    items = _valid_items(items)
+    if not items:
+        return
+
+    try:
+        item_index_collection.bulk_write(
+            [_posting_update(user_oid, item, "$setDifference") for item in items],
+            ordered=False,
+        )
+
+        # an emptied posting reads like a missing one; the count filter keeps
+        # any that a concurrent add has just refilled
+        for media_type in MEDIA_TYPES:
+            tmdb_ids = [item["tmdb_id"] for item in items if item["media_type"] == media_type]
+            if tmdb_ids:
+                item_index_collection.delete_many(
+                    {"media_type": media_type, "tmdb_id": {"$in": tmdb_ids}, "count": 0}
+                )
+    except Exception:
+        traceback.print_exc()
+
+
+# --- READS ---
+def get_popularity(media_type: str, tmdb_ids: Iterable[int]) -> Counter:
+    """
+    Number of users holding each of the given items in their My List
+    """
+    tmdb_ids = list(tmdb_ids)
+    if not tmdb_ids:
+        return Counter()
+
+    docs = item_index_collection.find(
+        {"media_type": media_type, "tmdb_id": {"$in": tmdb_ids}, "count": {"$gt": 0}},
+        {"_id": 0, "tmdb_id": 1, "count": 1},
+    )
+
+    return Counter({d["tmdb_id"]: d.get("count", 0) for d in docs})
+
+
+# --- FULL REBUILD / REPAIR ---
+def rebuild_item_index():
+    """
+    Recompute every posting list from users.my_list.
+
+    $out replaces the target collection atomically and keeps its indexes,
+    so readers never observe a half-built index. It also drops every
+    incremental update made while the aggregation ran, so the users whose
+    list changed since the start are reconciled once it is in place.
+    """
+    started = time.time()
+    replay_from = datetime.utcnow() - timedelta(seconds=REPLAY_MARGIN_SECONDS)
+
+    users_collection.aggregate([
+        {"$project": {"my_list": 1}},
+        {"$unwind": "$my_list"},
+        {"$match": {"my_list.media_type": {"$in": list(MEDIA_TYPES)}}},
+        {
+            "$group": {
+                "_id": {
+                    "media_type": "$my_list.media_type",
+                    "tmdb_id": "$my_list.tmdb_id",
+                },
+                "users": {"$addToSet": "$_id"},
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "media_type": "$_id.media_type",
+                "tmdb_id": "$_id.tmdb_id",
+                "users": 1,
+                "count": {"$size": "$users"},
+            }
+        },
+        {"$out": item_index_collection.name},
+    ])
+
+    replayed = 0
+    for user in users_collection.find(
+        {"list_updated_at": {"$gte": replay_from}},
+        {"my_list": 1}
+    ):
+        _reconcile_user(user["_id"], user.get("my_list"))
+        replayed += 1
+
+    print(f"Item index rebuilt in {time.time() - started:.2f}s ({replayed} users replayed)")
+
+
+def _reconcile_user(user_oid: ObjectId, my_list: Iterable[Any]):
+    """
+    Make one user's postings match their current My List
+    """
+    items = _valid_items(my_list)
+    current = {(item["media_type"], item["tmdb_id"]) for item in items}
+
+    stale = [
+        {"media_type": d["media_type"], "tmdb_id": d["tmdb_id"]}
+        for d in item_index_collection.find(
+            {"users": user_oid},
+            {"_id": 0, "media_type": 1, "tmdb_id": 1}
+        )
+        if (d["media_type"], d["tmdb_id"]) not in current
+    ]
+
+    record_list_add(user_oid, items)
+    record_list_remove(user_oid, stale)
+
+
+def _repair_loop(interval: int):
+    # Bootstrap an empty index right away instead of waiting a full interval
+    try:
+        if item_index_collection.estimated_document_count() == 0:
+            rebuild_item_index()
+    except Exception:
+        traceback.print_exc()
+
+    while True:
+        time.sleep(interval)
+        try:
+            rebuild_item_index()
+        except Exception:
+            traceback.print_exc()
+
+
+def start_item_index_repair(interval: int = REPAIR_INTERVAL_SECONDS):
+    global _repair_thread
+
+    if interval <= 0:
+        return
+
+    with _repair_lock:
+        if _repair_thread is not None:
+            return
+
+        _repair_thread = threading.Thread(
+            target=_repair_loop,
+            args=(interval,),
+            name="item-index-repair",
+            daemon=True,
+        )
+        _repair_thread.start()
@@ -0,0 +1,29 @@
+from app.db import users_collection
+from app.services.item_index_service import record_list_add, record_list_remove
+from app.services.recommendation_service import refresh_user_rows
+from app.services.recommendation_cache import recommendation_cache
+from bson import ObjectId
+from datetime import datetime
+from typing import Any, Iterable
+
+
+def on_list_changed(
+    user_oid: ObjectId,
+    added: Iterable[Any] = (),
+    removed: Iterable[Any] = (),
+):
+    """
+    Single hook for every write to a user's My List / interactions.
+    Called after the user document has been updated.
+    """
+    # lets precomputed recommendations detect that they are stale
+    users_collection.update_one(
+        {"_id": user_oid},
+        {"$set": {"list_updated_at": datetime.utcnow()}}
+    )
+
+    record_list_add(user_oid, added)
+    record_list_remove(user_oid, removed)
+
+    refresh_user_rows(user_oid)
+    recommendation_cache.invalidate_user(str(user_oid))
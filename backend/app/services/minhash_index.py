@@ -0,0 +1,206 @@
+from typing import Dict, Iterable, List, Optional, Set
+import threading
+import numpy as np
+
+
+# 2^31 - 1: (a * x + b) stays below 2^63 for 32-bit x, so uint64 math is exact
+_PRIME = np.uint64((1 << 31) - 1)
+
+# users hashed per vectorized chunk in bulk loads
+_BULK_CHUNK = 2000
+
+
+class MinHashLSH:
+    """
+    MinHash signatures per user plus an LSH banding index.
+
+    `num_perm` hash functions are split into `bands` bands of
+    num_perm / bands rows; two users land in the same bucket of a band
+    when that whole slice of their signatures matches. The collision
+    probability is 1 - (1 - J^rows)^bands for Jaccard similarity J, so
+    the defaults (64 bands x 2 rows) surface users down to J ~ 0.12.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 64, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.RLock()
+
+        # one signature row per user; rows of removed users are recycled
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._row_of: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._free: List[int] = []
+
+        self._buckets: List[Dict[int, Set[int]]] = [{} for _ in range(bands)]
+
+    # --- SIGNATURES ---
+    def _hash(self, x: np.ndarray) -> np.ndarray:
+        x = (x.astype(np.int64) & 0xFFFFFFFF).astype(np.uint64)
+        return (self._a[:, None] * x[None, :] + self._b[:, None]) % _PRIME
+
+    def signature(self, items: Iterable[int]) -> Optional[np.ndarray]:
+        x = np.fromiter(items, dtype=np.int64)
+        if x.size == 0:
+            return None
+
+        return self._hash(x).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        (n, num_perm) signatures -> (n, bands) integer bucket keys
+        """
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+
+        keys = np.zeros(bands.shape[:2], dtype=np.uint64)
+        for r in range(self.rows):
+            keys = keys * np.uint64(0x100000001B3) ^ bands[:, :, r]
+
+        return keys
+
+    # --- UPDATES ---
+    def _allocate_row(self, user_key: str) -> int:
+        if self._free:
+            row = self._free.pop()
+            self._keys[row] = user_key
+        else:
+            row = len(self._keys)
+            self._keys.append(user_key)
+
+            if row >= len(self._signatures):
+                grown = np.zeros((max(16, 2 * len(self._signatures)), self.num_perm), dtype=np.uint32)
+                grown[:len(self._signatures)] = self._signatures
+                self._signatures = grown
+
+        self._row_of[user_key] = row
+        return row
+
+    def _index_row(self, row: int, keys: np.ndarray):
+        for band, key in enumerate(keys.tolist()):
+            self._buckets[band].setdefault(key, set()).add(row)
+
+    def set_user(self, user_key: str, items: Iterable[int]):
+        with self._lock:
+            self._remove(user_key)
+
+            signature = self.signature(set(items))
+            if signature is None:
+                return
+
+            row = self._allocate_row(user_key)
+            self._signatures[row] = signature
+
+            self._index_row(row, self._band_keys(signature[None, :])[0])
+
+    def bulk_load(self, rows: Dict[str, Iterable[int]]):
+        """
+        Insert many users at once: signatures are hashed in vectorized
+        chunks and bucket membership is grouped per band with numpy
+        """
+        users = [(key, np.fromiter(set(items), dtype=np.int64)) for key, items in rows.items()]
+        users = [(key, items) for key, items in users if items.size]
+
+        if not users:
+            return
+
+        with self._lock:
+            for key, _ in users:
+                self._remove(key)
+
+            new_rows = np.fromiter(
+                (self._allocate_row(key) for key, _ in users),
+                dtype=np.int64,
+                count=len(users),
+            )
+
+            for start in range(0, len(users), _BULK_CHUNK):
+                chunk = users[start:start + _BULK_CHUNK]
+
+                lengths = np.array([items.size for _, items in chunk])
+                offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+                flat = np.concatenate([items for _, items in chunk])
+
+                hashed = np.minimum.reduceat(self._hash(flat), offsets, axis=1)
+                self._signatures[new_rows[start:start + len(chunk)]] = hashed.T
+
+            band_keys = self._band_keys(self._signatures[new_rows])
+
+            for band in range(self.bands):
+                keys = band_keys[:, band]
+                order = np.argsort(keys, kind="stable")
+                unique, starts = np.unique(keys[order], return_index=True)
+                groups = np.split(new_rows[order], starts[1:])
+
+                buckets = self._buckets[band]
+                for key, group in zip(unique.tolist(), groups):
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        buckets[key] = set(group.tolist())
+                    else:
+                        bucket.update(group.tolist())
+
+    def _remove(self, user_key: str):
+        row = self._row_of.pop(user_key, None)
+        if row is None:
+            return
+
+        keys = self._band_keys(self._signatures[row][None, :])[0]
+
+        for band, key in enumerate(keys.tolist()):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self._buckets[band][key]
+
+        self._keys[row] = None
+        self._free.append(row)
+
+    # --- QUERIES ---
+    def query(self, items: Iterable[int], top_n: int, exclude: Optional[str] = None) -> List[str]:
+        """
+        Up to top_n users sharing at least one LSH bucket with `items`,
+        ranked by estimated Jaccard similarity
+        """
+        signature = self.signature(items)
+        if signature is None:
+            return []
+
+        keys = self._band_keys(signature[None, :])[0].tolist()
+
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(keys):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    candidates |= bucket
+
+            excluded = self._row_of.get(exclude) if exclude else None
+            candidates.discard(excluded)
+
+            if not candidates:
+                return []
+
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            estimated = (self._signatures[rows] == signature).mean(axis=1)
+
+            if len(rows) > top_n:
+                top = np.argpartition(-estimated, top_n - 1)[:top_n]
+            else:
+                top = np.arange(len(rows))
+
+            top = top[np.argsort(-estimated[top])]
+
+            return [self._keys[rows[i]] for i in top]
+
+    def __len__(self):
+        return len(self._row_of)
@@ -0,0 +1,172 @@
+from app.db import movies_collection, tv_collection
+from app.services.generation import current_catalog_generation
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+import traceback
+import heapq
+import time
+import os
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+# documents kept per (media type, genre) list
+POPULAR_LIST_SIZE = int(os.getenv("POPULAR_LIST_SIZE", 100))
+
+ALL_GENRES = None
+
+
+def _collection(media_type: str):
+    return movies_collection if media_type == "movie" else tv_collection
+
+
+def _rank_key(doc: Dict[str, Any]) -> Tuple[float, int]:
+    return -(doc.get("popularity") or 0), doc["tmdb_id"]
+
+
+class _Lists:
+    def __init__(self, generation: int, lists: Dict[Optional[str], List[Dict[str, Any]]], seconds: float):
+        self.generation = generation
+        self.lists = lists
+        self.seconds = seconds
+        self.built_at = time.time()
+
+
+class PopularLists:
+    """
+    Popularity-ranked catalog documents per media type and genre, built in
+    one collection scan at startup and again whenever the catalog
+    generation moves (every reseed bumps it).
+
+    Cold-start recommendations and the last serving tier are a k-way merge
+    over the user's preferred genres, so neither sorts in Mongo.
+    """
+
+    def __init__(self, size: int = POPULAR_LIST_SIZE):
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._media: Dict[str, _Lists] = {}
+        self._rebuilding = set()
+
+    # --- BUILD ---
+    def rebuild(self, media_type: str) -> _Lists:
+        started = time.perf_counter()
+        generation = current_catalog_generation()
+
+        by_genre: Dict[Optional[str], List[Dict[str, Any]]] = {ALL_GENRES: []}
+
+        for doc in _collection(media_type).find({}, {"_id": 0}):
+            by_genre[ALL_GENRES].append(doc)
+            for genre in doc.get("genres") or ():
+                by_genre.setdefault(genre, []).append(doc)
+
+        lists = {
+            genre: heapq.nsmallest(self.size, docs, key=_rank_key)
+            for genre, docs in by_genre.items()
+        }
+
+        built = _Lists(generation, lists, time.perf_counter() - started)
+
+        with self._lock:
+            self._media[media_type] = built
+
+        return built
+
+    def _rebuild_in_background(self, media_type: str):
+        try:
+            self.rebuild(media_type)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._rebuilding.discard(media_type)
+
+    def warm(self):
+        """
+        Build every media type up front (app startup)
+        """
+        for media_type in MEDIA_TYPES:
+            try:
+                self.rebuild(media_type)
+            except Exception:
+                traceback.print_exc()
+
+    def _current(self, media_type: str) -> _Lists:
+        with self._lock:
+            built = self._media.get(media_type)
+
+            # after a reseed keep serving the old lists until the new ones exist
+            stale = built is not None and built.generation != current_catalog_generation()
+            if stale and media_type not in self._rebuilding:
+                self._rebuilding.add(media_type)
+                threading.Thread(
+                    target=self._rebuild_in_background,
+                    args=(media_type,),
+                    daemon=True
+                ).start()
+
+        if built is None:
+            return self.rebuild(media_type)
+
+        return built
+
+    # --- SERVING ---
+    def get(self, media_type: str, genre: Optional[str] = ALL_GENRES) -> List[Dict[str, Any]]:
+        return self._current(media_type).lists.get(genre, [])
+
+    def ranked(
+        self,
+        media_type: str,
+        genres: Iterable[str] = (),
+        limit: int = 12,
+        exclude: Iterable[int] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Most popular documents across the given genres (all genres when
+        empty), deduplicated and without the excluded ids
+        """
+        if limit <= 0:
+            return []
+
+        lists = self._current(media_type).lists
+
+        genres = [g for g in genres if g in lists]
+        sources = [lists[g] for g in genres] or [lists[ALL_GENRES]]
+
+        seen = set(exclude)
+        out = []
+
+        for doc in heapq.merge(*sources, key=_rank_key):
+            if doc["tmdb_id"] in seen:
+                continue
+
+            seen.add(doc["tmdb_id"])
+            out.append(doc)
+
+            if len(out) >= limit:
+                break
+
+        if len(out) < limit and genres:
+            # thin genres are topped up from the overall list
+            out += self.ranked(media_type, (), limit - len(out), seen)
+
+        return out
+
+    def ranked_ids(self, media_type: str, genres: Iterable[str] = (), limit: int = 12, exclude: Iterable[int] = ()) -> List[int]:
+        return [doc["tmdb_id"] for doc in self.ranked(media_type, genres, limit, exclude)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                media_type: {
+                    "generation": built.generation,
+                    "genres": len(built.lists) - 1,
+                    "build_seconds": round(built.seconds, 3),
+                    "built_at": built.built_at,
+                }
+                for media_type, built in self._media.items()
+            }
+
+
+popular_lists = PopularLists()
@@ -0,0 +1,150 @@
+from app.services.generation import current_catalog_generation
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+import threading
+import time
+import os
+
+
+CACHE_MAX_ENTRIES = int(os.getenv("RECOMMENDATION_CACHE_SIZE", 10000))
+CACHE_TTL_SECONDS = float(os.getenv("RECOMMENDATION_CACHE_TTL", 10 * 60))
+
+
+class RecommendationCache:
+    """
+    Bounded LRU + TTL cache of per-user recommendation results.
+
+    Keys are (user, media_type, limit). Entries remember the catalog
+    generation they were computed under and are ignored once it moves on.
+    Invalidation is per user: a list write drops only that user's entries.
+
+    invalidate_user only reaches the process that handled the write, so
+    entries also remember the user's list_updated_at as of their
+    computation; a lookup passing a newer one (a write seen by any other
+    worker) treats the entry as gone.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Any, Any]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[Tuple]] = {}
+
+        # a user's version moves on every invalidation so an in-flight
+        # computation that started before a list write cannot store its
+        # stale result. Versions come from one sequence and are kept LRU
+        # like the entries; users evicted from here read the highest
+        # evicted version, so an eviction can only reject a store.
+        self._sequence = 0
+        self._version_floor = 0
+        self._user_versions: "OrderedDict[str, int]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # --- READ / WRITE ---
+    def get(self, user_key: str, media_type: str, limit: Hashable, list_updated_at: Any = None) -> Optional[Any]:
+        key = (user_key, media_type, limit)
+        generation = current_catalog_generation()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, stored_generation, value, stored_list_at = entry
+
+            written_since = list_updated_at is not None and (
+                stored_list_at is None or list_updated_at > stored_list_at
+            )
+
+            if written_since or stored_generation != generation or time.time() - stored_at > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def has_user(self, user_key: str) -> bool:
+        with self._lock:
+            return user_key in self._user_keys
+
+    def user_version(self, user_key: str) -> int:
+        with self._lock:
+            return self._user_versions.get(user_key, self._version_floor)
+
+    def set(self, user_key: str, media_type: str, limit: Hashable, value: Any, version: int, list_updated_at: Any = None):
+        key = (user_key, media_type, limit)
+        generation = current_catalog_generation()
+
+        with self._lock:
+            if self._user_versions.get(user_key, self._version_floor) != version:
+                return
+
+            self._entries[key] = (time.time(), generation, value, list_updated_at)
+            self._entries.move_to_end(key)
+            self._user_keys.setdefault(user_key, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    # --- INVALIDATION ---
+    def invalidate_user(self, user_key: str):
+        with self._lock:
+            self._sequence += 1
+            self._user_versions[user_key] = self._sequence
+            self._user_versions.move_to_end(user_key)
+
+            while len(self._user_versions) > self.max_entries:
+                _, evicted = self._user_versions.popitem(last=False)
+                self._version_floor = max(self._version_floor, evicted)
+
+            for key in self._user_keys.pop(user_key, set()):
+                self._entries.pop(key, None)
+
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _remove(self, key: Tuple):
+        self._entries.pop(key, None)
+
+        keys = self._user_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[key[0]]
+
+    # --- STATS ---
+    def stats(self) -> Dict[str, Any]:
+        generation = current_catalog_generation()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "generation": generation,
+            }
+
+
+recommendation_cache = RecommendationCache()
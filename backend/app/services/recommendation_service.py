@@ -3,12 +3,28 @@ from app.db import (
     movies_collection,
     tv_collection,
     interactions_collection,
+    user_recommendations_collection,
 )
+from app.services.item_index_service import get_popularity
+from app.services.user_item_matrix import UserItemMatrix
+from app.services.minhash_index import MinHashLSH
+from app.services.recommendation_cache import recommendation_cache
+from app.services.generation import current_catalog_generation
+from app.services.artifact_registry import artifact_registry, collab_mode
+from app.services.content_artifacts import EmbeddingIndex, RowLookup
+from app.services.content_profile import ProfileScorer
+from app.services.popular_lists import popular_lists
+from app.services.serving_metrics import StageTimer, serving_metrics
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from bson import ObjectId
-from typing import Any, List, Set, Dict
+from datetime import datetime, timedelta
+from pymongo import ReplaceOne
+from typing import Any, List, Optional, Set, Dict, Tuple
+import numpy as np
+import threading
 import traceback
-import pickle
+import time
 import os
 
 
@@ -18,15 +34,43 @@ INTERACTION_WEIGHTS = {
     "love": 3
 }
 
+# Hybrid blend:
+#   (collab * w_collab + content * w_content + interaction * w_interaction)
+#   / (1 + POPULARITY_DAMPING * my_list_count)
+BLEND_WEIGHTS = {
+    "collab": float(os.getenv("BLEND_COLLAB_WEIGHT", 0.5)),
+    "content": float(os.getenv("BLEND_CONTENT_WEIGHT", 0.2)),
+    "interaction": float(os.getenv("BLEND_INTERACTION_WEIGHT", 0.3)),
+}
+POPULARITY_DAMPING = float(os.getenv("BLEND_POPULARITY_DAMPING", 1.0))
+
+# Stage one keeps at most this many candidates per source, so the blend
+# and re-rank cost is bounded by the caps rather than by the data
+CANDIDATE_CAPS = {
+    "collab": int(os.getenv("CANDIDATES_COLLAB", 300)),
+    "content": int(os.getenv("CANDIDATES_CONTENT", 300)),
+    "popular": int(os.getenv("CANDIDATES_POPULAR", 50)),
+}
+
+# Stage two re-ranks the best RERANK_POOL_FACTOR * limit blended candidates
+# by maximal marginal relevance: MMR_LAMBDA trades relevance against
+# TF-IDF similarity to the items already picked (1 disables it)
+RERANK_POOL_FACTOR = int(os.getenv("RERANK_POOL_FACTOR", 4))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.7))
+
 
-# --- LOAD TF-IDF MODELS ---
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+# TF-IDF and item-item collaborative neighbors are owned by the artifact
+# registry and hot-reloaded when a build publishes a new version
+artifact_registry.on_swap(recommendation_cache.clear)
 
-with open(os.path.join(PROJECT_ROOT, "models/movie_tfidf.pkl"), "rb") as f:
-    movie_tfidf = pickle.load(f)
+# "hybrid": blended collab/content/interaction scores above, "als": the
+# implicit matrix factorization artifact (falls back to hybrid until one
+# is published). Overridable per request with ?engine=
+ENGINES = ("hybrid", "als")
+RECOMMENDER_ENGINE = os.getenv("RECOMMENDER_ENGINE", "hybrid")
 
-with open(os.path.join(PROJECT_ROOT, "models/tv_tfidf.pkl"), "rb") as f:
-    tv_tfidf = pickle.load(f)
+# scores media types side by side for the combined endpoint
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="recommend")
 
 
 def _extract_ids(raw_list: List[Any], media_type: str) -> List[int]:
@@ -38,15 +82,12 @@ def _extract_ids(raw_list: List[Any], media_type: str) -> List[int]:
     return ids
 
 
-def _compute_global_popularity(media_type: str) -> Counter:
-    global_counts = Counter()
-
-    for u in users_collection.find({}, {"my_list": 1}):
-        for item in u.get("my_list", []) or []:
-            if item.get("media_type") == media_type:
-                global_counts[item["tmdb_id"]] += 1
-
-    return global_counts
+def _compute_global_popularity(media_type: str, tmdb_ids) -> Counter:
+    """
+    My List counts for the candidate items only, read from the maintained
+    item index instead of scanning every user
+    """
+    return get_popularity(media_type, tmdb_ids)
 
 
 def _get_user_interactions(user_oid: ObjectId, media_type: str):
@@ -61,11 +102,168 @@ def _get_user_interactions(user_oid: ObjectId, media_type: str):
     }
 
 
+def _get_user_interactions_by_type(user_oid: ObjectId, media_types) -> Dict[str, Dict[int, float]]:
+    """
+    Same as _get_user_interactions for several media types in one query
+    """
+    weights = {media_type: {} for media_type in media_types}
+
+    for i in interactions_collection.find({
+        "user_id": user_oid,
+        "media_type": {"$in": list(media_types)}
+    }):
+        weights[i["media_type"]][i["tmdb_id"]] = INTERACTION_WEIGHTS.get(i["interaction"], 1)
+
+    return weights
+
+
+# --- USER x ITEM MATRIX ---
+# Full reload interval; catches writes handled by other worker processes
+MATRIX_REFRESH_SECONDS = int(os.getenv("USER_MATRIX_REFRESH_SECONDS", 15 * 60))
+
+# "exact": score against every user, "lsh": MinHash/LSH top-N similar
+# users rescored with the exact weighted Jaccard
+SIMILAR_USERS_MODE = os.getenv("SIMILAR_USERS_MODE", "exact")
+LSH_TOP_N = int(os.getenv("LSH_TOP_N", 200))
+
+_matrices: Dict[str, UserItemMatrix] = {}
+_lsh_indexes: Dict[str, MinHashLSH] = {}
+_matrix_built_at: Dict[str, float] = {}
+_matrix_rebuilding: Dict[str, Set[str]] = {}
+_matrix_lock = threading.Lock()
+
+
+def _load_user_item_rows(media_type: str) -> Dict[str, Dict[int, float]]:
+    weights = {}
+
+    for i in interactions_collection.find(
+        {"media_type": media_type},
+        {"_id": 0, "user_id": 1, "tmdb_id": 1, "interaction": 1},
+        batch_size=5000,
+    ):
+        weights[(str(i["user_id"]), i["tmdb_id"])] = INTERACTION_WEIGHTS.get(i["interaction"], 1)
+
+    rows = {}
+
+    for u in users_collection.find(
+        {"my_list.media_type": media_type},
+        {"my_list": 1},
+        batch_size=5000,
+    ):
+        key = str(u["_id"])
+        rows[key] = {
+            tmdb_id: weights.get((key, tmdb_id), 1)
+            for tmdb_id in _extract_ids(u.get("my_list", []), media_type)
+        }
+
+    return rows
+
+
+def _build_user_matrix(media_type: str):
+    started = time.time()
+    rows = _load_user_item_rows(media_type)
+    matrix = UserItemMatrix.from_rows(media_type, rows)
+
+    lsh = None
+    if SIMILAR_USERS_MODE == "lsh":
+        lsh = MinHashLSH()
+        lsh.bulk_load({user_key: items.keys() for user_key, items in rows.items()})
+
+    with _matrix_lock:
+        _matrices[media_type] = matrix
+        if lsh is not None:
+            _lsh_indexes[media_type] = lsh
+        _matrix_built_at[media_type] = started
+        touched = _matrix_rebuilding.pop(media_type, set())
+
+    # replay users whose list changed while the snapshot was being read
+    for user_key in touched:
+        refresh_user_rows(ObjectId(user_key), [media_type])
+
+
+def _rebuild_user_matrix_in_background(media_type: str):
+    try:
+        _build_user_matrix(media_type)
+    except Exception:
+        with _matrix_lock:
+            _matrix_rebuilding.pop(media_type, None)
+        traceback.print_exc()
+
+
+def _get_user_matrix(media_type: str) -> UserItemMatrix:
+    with _matrix_lock:
+        matrix = _matrices.get(media_type)
+        stale = time.time() - _matrix_built_at.get(media_type, 0) > MATRIX_REFRESH_SECONDS
+
+        if matrix is None:
+            _matrix_rebuilding.setdefault(media_type, set())
+
+        elif stale and media_type not in _matrix_rebuilding:
+            # keep serving the current matrix while a fresh one loads
+            _matrix_rebuilding[media_type] = set()
+            threading.Thread(
+                target=_rebuild_user_matrix_in_background,
+                args=(media_type,),
+                daemon=True,
+            ).start()
+
+    if matrix is None:
+        _build_user_matrix(media_type)
+        matrix = _matrices[media_type]
+
+    return matrix
+
+
+def refresh_user_rows(user_oid: ObjectId, media_types=("movie", "tv")):
+    """
+    Re-read one user's list + interactions into the in-memory matrices
+    """
+    try:
+        user = users_collection.find_one({"_id": user_oid}, {"my_list": 1}) or {}
+        user_key = str(user_oid)
+
+        for media_type in media_types:
+            with _matrix_lock:
+                matrix = _matrices.get(media_type)
+                if media_type in _matrix_rebuilding:
+                    _matrix_rebuilding[media_type].add(user_key)
+
+            if matrix is None:
+                continue
+
+            weights = _get_user_interactions(user_oid, media_type)
+            item_ids = _extract_ids(user.get("my_list", []), media_type)
+
+            matrix.set_user(user_key, {
+                tmdb_id: weights.get(tmdb_id, 1)
+                for tmdb_id in item_ids
+            })
+
+            lsh = _lsh_indexes.get(media_type)
+            if lsh is not None:
+                lsh.set_user(user_key, item_ids)
+
+    except Exception:
+        traceback.print_exc()
+
+
 # --- CONTENT SCORING ---
-def _get_content_scores(item_ids: List[int], tfidf_model) -> Dict[int, float]:
+def _get_content_scores(
+    item_ids: List[int],
+    tfidf_model,
+    weights: Optional[Dict[int, float]] = None,
+    user_key: Optional[str] = None
+) -> Dict[int, float]:
     """
     Aggregate TF-IDF similarity scores across user's items
     """
+    if isinstance(tfidf_model, ProfileScorer):
+        weights = weights or {}
+        return tfidf_model.scores({i: weights.get(i, 1) for i in item_ids}, user_key)
+
+    if isinstance(tfidf_model, EmbeddingIndex):
+        return tfidf_model.aggregate(item_ids)
+
     scores = {}
 
     for item_id in item_ids:
@@ -77,91 +275,233 @@ def _get_content_scores(item_ids: List[int], tfidf_model) -> Dict[int, float]:
     return scores
 
 
-def _collaborative_recommendation(
+# --- ITEM-ITEM COLLABORATIVE SCORING ---
+def _get_item_collab_scores(
+    item_ids: List[int],
+    collab_model,
+    weights: Dict[int, float]
+) -> Dict[int, float]:
+    """
+    Sum the precomputed co-occurrence neighbors of the user's items,
+    scaled by how strongly the user rated each item
+    """
+    current = set(item_ids)
+    scores = {}
+
+    for item_id in item_ids:
+        weight = weights.get(item_id, 1)
+
+        for sim_id, sim_score in collab_model.get(item_id, []):
+            if sim_id in current:
+                continue
+            scores[sim_id] = scores.get(sim_id, 0) + weight * sim_score
+
+    return scores
+
+
+def _get_collab_scores(
     user_oid: ObjectId,
     item_ids: List[int],
     media_type: str,
-    collection,
-    tfidf_model,
-    limit: int
-):
-    if len(item_ids) < 3:
-        return list(
-            collection.find({}, {"_id": 0})
-            .sort("popularity", -1)
-            .limit(limit)
-        )
+    artifacts,
+    weights: Dict[int, float]
+) -> Dict[int, float]:
+    if collab_mode(artifacts) == "item":
+        return _get_item_collab_scores(item_ids, artifacts.collab, weights)
 
-    current_set: Set[int] = set(item_ids)
-    current_weights = _get_user_interactions(user_oid, media_type)
-    global_counts = _compute_global_popularity(media_type)
-
-    # --- COLLABORATIVE SCORES ---
-    collab_scores = {}
-
-    similar_users = users_collection.find(
-        {
-            "_id": {"$ne": user_oid},
-            "my_list.tmdb_id": {"$in": item_ids},
-            "my_list.media_type": media_type
-        },
-        {"my_list": 1}
+    matrix = _get_user_matrix(media_type)
+
+    # LSH narrows the scan to the most similar users; they are then
+    # rescored with the exact weighted Jaccard
+    candidates = None
+    lsh = _lsh_indexes.get(media_type)
+    if SIMILAR_USERS_MODE == "lsh" and lsh is not None:
+        candidates = lsh.query(item_ids, LSH_TOP_N, exclude=str(user_oid))
+
+    # weighted Jaccard via sparse mat-vecs
+    return matrix.collaborative_scores(
+        str(user_oid),
+        item_ids,
+        weights,
+        candidates,
+        top_k=CANDIDATE_CAPS["collab"]
     )
 
-    for user in similar_users:
 
-        other_set = {
-            item["tmdb_id"]
-            for item in user.get("my_list", [])
-            if item.get("media_type") == media_type
-        }
+# --- HYBRID MERGE ---
+def _score_arrays(scores: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+    ids = np.fromiter(scores.keys(), dtype=np.int64, count=len(scores))
+    values = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+    return ids, values
 
-        intersection = current_set & other_set
-        if not intersection:
-            continue
 
-        weighted_intersection = sum(
-            current_weights.get(i, 1) for i in intersection
-        )
+def _top_scores(scores: Dict[int, float], k: int) -> Dict[int, float]:
+    """
+    The k best entries (ties by id)
+    """
+    if len(scores) <= k:
+        return scores
 
-        union = len(current_set | other_set)
-        similarity = weighted_intersection / union
+    ids, values = _score_arrays(scores)
+    keep = np.lexsort((ids, -values))[:k]
 
-        for item_id in other_set - current_set:
-            collab_scores[item_id] = collab_scores.get(item_id, 0) + similarity
+    return dict(zip(ids[keep].tolist(), values[keep].tolist()))
 
-    # --- CONTENT SCORES ---
-    content_scores = _get_content_scores(item_ids, tfidf_model)
 
-    # --- MERGE + DEDUP ---
-    final_scores = {}
+class _CandidateSlots:
+    """
+    Dense slot per candidate id: its catalog row, or a slot past the end
+    of the catalog for ids the loaded content version does not have
+    """
 
-    all_ids = set(collab_scores) | set(content_scores)
+    def __init__(self, row_lookup: RowLookup, ids: np.ndarray):
+        self._lookup = row_lookup
 
-    for item_id in all_ids:
+        rows = row_lookup.rows(ids)
+        self._extra = np.unique(ids[rows < 0])
 
-        collab = collab_scores.get(item_id, 0)
-        content = content_scores.get(item_id, 0)
-        interaction = current_weights.get(item_id, 1)
-        popularity = global_counts.get(item_id, 1)
+        self.size = row_lookup.size + len(self._extra)
 
-        score = (
-            collab * 0.5 +
-            content * 0.2 +
-            interaction * 0.3
-        ) / (1 + popularity)
+    def of(self, ids: np.ndarray) -> np.ndarray:
+        slots = self._lookup.rows(ids)
 
-        final_scores[item_id] = score
+        missing = np.flatnonzero(slots < 0)
+        if len(missing) and len(self._extra):
+            at = np.minimum(np.searchsorted(self._extra, ids[missing]), len(self._extra) - 1)
+            known = self._extra[at] == ids[missing]
+            slots[missing[known]] = self._lookup.size + at[known]
 
-    if not final_scores:
-        return list(
-            collection.find({"tmdb_id": {"$nin": list(current_set)}}, {"_id": 0})
-            .sort("popularity", -1)
-            .limit(limit)
-        )
+        return slots
+
+    def ids(self, slots: np.ndarray) -> np.ndarray:
+        catalog = slots < self._lookup.size
+
+        ids = np.empty(len(slots), dtype=np.int64)
+        ids[catalog] = self._lookup.index_to_tmdb[slots[catalog]]
+        ids[~catalog] = self._extra[slots[~catalog] - self._lookup.size]
+
+        return ids
+
+
+def _scatter(slots: _CandidateSlots, ids: np.ndarray, values: np.ndarray, default: float) -> np.ndarray:
+    """
+    (ids, values) as a dense array over the candidate slots, `default`
+    elsewhere
+    """
+    out = np.full(slots.size, default, dtype=np.float64)
+
+    at = slots.of(ids)
+    known = at >= 0
+    out[at[known]] = values[known]
+
+    return out
+
+
+def _blend_scored(
+    row_lookup: RowLookup,
+    collab_scores: Dict[int, float],
+    content_scores: Dict[int, float],
+    interactions: Dict[int, float],
+    popularity,
+    limit: int,
+    weights: Optional[Dict[str, float]] = None,
+    damping: float = POPULARITY_DAMPING
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top `limit` of the collab + content candidates and their hybrid
+    scores, best first (ties by id).
+    `popularity(ids)` returns My List counts.
+    """
+    weights = weights or BLEND_WEIGHTS
+
+    collab_ids, collab_values = _score_arrays(collab_scores)
+    content_ids, content_values = _score_arrays(content_scores)
+    slots = _CandidateSlots(row_lookup, np.concatenate((collab_ids, content_ids)))
+
+    is_candidate = np.zeros(slots.size, dtype=bool)
+    is_candidate[slots.of(collab_ids)] = True
+    is_candidate[slots.of(content_ids)] = True
+
+    candidates = np.flatnonzero(is_candidate)
+    if not len(candidates) or limit <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    collab = _scatter(slots, collab_ids, collab_values, 0)
+    content = _scatter(slots, content_ids, content_values, 0)
+    interaction = _scatter(slots, *_score_arrays(interactions), 1)
+    counts = _scatter(slots, *_score_arrays(popularity(slots.ids(candidates).tolist())), 1)
+
+    score = (
+        collab * weights["collab"] +
+        content * weights["content"] +
+        interaction * weights["interaction"]
+    ) / (1 + damping * counts)
+
+    score = score[candidates]
+
+    k = min(limit, len(candidates))
+    top = np.argpartition(-score, k - 1)[:k]
+
+    top_ids = slots.ids(candidates[top])
+    order = np.lexsort((top_ids, -score[top]))
+
+    return top_ids[order], score[top][order]
+
+
+def _blend(*args, **kwargs) -> List[int]:
+    """
+    Ids of _blend_scored
+    """
+    return _blend_scored(*args, **kwargs)[0].tolist()
+
+
+# --- DIVERSITY RE-RANK ---
+def _mmr(
+    row_lookup: RowLookup,
+    matrix,
+    ids: np.ndarray,
+    scores: np.ndarray,
+    limit: int,
+    lam: float = MMR_LAMBDA
+) -> List[int]:
+    """
+    Maximal marginal relevance over a pool sorted best first: each pick
+    maximizes  lam * relevance - (1 - lam) * max cosine to earlier picks,
+    with cosines between the pool's L2-normalized TF-IDF rows. Ids the
+    content index does not know count as dissimilar to everything.
+    """
+    if lam >= 1 or len(ids) <= 1:
+        return ids[:limit].tolist()
+
+    rows = row_lookup.rows(ids)
+    known = rows >= 0
+
+    vectors = matrix[np.where(known, rows, 0)]
+    similarity = (vectors @ vectors.T).toarray()
+    similarity[~known, :] = 0
+    similarity[:, ~known] = 0
+
+    top = scores[0] if scores[0] > 0 else 1.0
+    relevance = scores / top
+
+    picked = []
+    closest = np.zeros(len(ids))
+    available = np.ones(len(ids), dtype=bool)
 
-    ranked_ids = sorted(final_scores, key=final_scores.get, reverse=True)[:limit]
+    for _ in range(min(limit, len(ids))):
+        gain = lam * relevance - (1 - lam) * closest
+        gain[~available] = -np.inf
 
+        # first maximum: ties keep the relevance order
+        pick = int(np.argmax(gain))
+        picked.append(pick)
+        available[pick] = False
+        closest = np.maximum(closest, similarity[pick])
+
+    return ids[picked].tolist()
+
+
+def _fetch_ordered(collection, ranked_ids: List[int]):
     items = list(
         collection.find(
             {"tmdb_id": {"$in": ranked_ids}},
@@ -175,47 +515,548 @@ def _collaborative_recommendation(
     return items
 
 
-def generate_user_movie_recommendations(user_id: Any, limit: int = 12):
-    try:
-        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
-        user = users_collection.find_one({"_id": user_oid})
-        if not user:
-            return []
+def _rank_item_ids(
+    user_oid: ObjectId,
+    item_ids: List[int],
+    media_type: str,
+    tfidf_model,
+    limit: int,
+    current_weights: Optional[Dict[int, float]] = None,
+    genres=()
+) -> List[int]:
+    current_set: Set[int] = set(item_ids)
+
+    # cold start: in-memory popularity lists of the preferred genres
+    if len(item_ids) < 3:
+        return popular_lists.ranked_ids(media_type, genres, limit, exclude=current_set)
+
+    if current_weights is None:
+        current_weights = _get_user_interactions(user_oid, media_type)
+
+    # one snapshot for every stage, so a swap mid-request cannot mix sets
+    artifacts = artifact_registry.get(media_type)
+
+    timer = StageTimer(serving_metrics)
+
+    # --- STAGE ONE: CAPPED CANDIDATES PER SOURCE ---
+    collab_scores = _top_scores(
+        _get_collab_scores(
+            user_oid,
+            item_ids,
+            media_type,
+            artifacts,
+            current_weights
+        ),
+        CANDIDATE_CAPS["collab"]
+    )
+    timer.lap("collab")
+
+    content_scores = _top_scores(
+        _get_content_scores(
+            item_ids,
+            tfidf_model,
+            current_weights,
+            str(user_oid)
+        ),
+        CANDIDATE_CAPS["content"]
+    )
+    timer.lap("content")
+
+    popular_ids = popular_lists.ranked_ids(
+        media_type,
+        genres,
+        CANDIDATE_CAPS["popular"],
+        exclude=current_set
+    )
+    timer.lap("popular")
+
+    if not collab_scores and not content_scores:
+        return popular_ids[:limit]
+
+    # --- STAGE TWO: BLEND, THEN DIVERSIFY ---
+    pool_ids, pool_scores = _blend_scored(
+        artifacts.row_lookup,
+        collab_scores,
+        content_scores,
+        current_weights,
+        lambda ids: _compute_global_popularity(media_type, ids),
+        RERANK_POOL_FACTOR * limit
+    )
+    timer.lap("blend")
+
+    ranked_ids = _mmr(artifacts.row_lookup, artifacts.matrix, pool_ids, pool_scores, limit)
+    timer.lap("rerank")
+
+    # popular-in-genre titles only fill a row the scored pool cannot;
+    # unscored, they must never outrank a scored candidate
+    if len(ranked_ids) < limit:
+        ranked = set(ranked_ids)
+        ranked_ids += [i for i in popular_ids if i not in ranked][:limit - len(ranked_ids)]
+
+    return ranked_ids
 
-        movie_ids = _extract_ids(user.get("my_list", []), "movie")
+
+def _collaborative_recommendation(
+    user_oid: ObjectId,
+    item_ids: List[int],
+    media_type: str,
+    collection,
+    tfidf_model,
+    limit: int,
+    current_weights: Optional[Dict[int, float]] = None,
+    genres=()
+):
+    # cold start: the popular lists already hold the documents
+    if len(item_ids) < 3:
+        return popular_lists.ranked(media_type, genres, limit, exclude=item_ids)
+
+    ranked_ids = _rank_item_ids(
+        user_oid,
+        item_ids,
+        media_type,
+        tfidf_model,
+        limit,
+        current_weights,
+        genres
+    )
+
+    return _fetch_ordered(collection, ranked_ids)
+
+
+# --- PRECOMPUTED RECOMMENDATIONS (precompute_recommendations.py) ---
+PRECOMPUTE_LIMIT = int(os.getenv("PRECOMPUTE_LIMIT", 24))
+PRECOMPUTED_MAX_AGE_SECONDS = int(os.getenv("PRECOMPUTED_MAX_AGE", 24 * 60 * 60))
+
+
+def _media_sources(media_type: str):
+    artifacts = artifact_registry.get(media_type)
+    collection = movies_collection if media_type == "movie" else tv_collection
+
+    return collection, artifacts.content_model
+
+
+def _load_precomputed_ids(user, media_type: str, limit: int) -> Optional[List[int]]:
+    """
+    Ranked ids from the batch job, or None when they are missing or stale:
+    older than the user's last list change, than the catalog generation,
+    or than PRECOMPUTED_MAX_AGE
+    """
+    doc = user_recommendations_collection.find_one(
+        {"user_id": user["_id"], "media_type": media_type}
+    )
+
+    if not doc or doc.get("limit", 0) < limit:
+        return None
+
+    if doc.get("generation") != current_catalog_generation():
+        return None
+
+    generated_at = doc["generated_at"]
+
+    if datetime.utcnow() - generated_at > timedelta(seconds=PRECOMPUTED_MAX_AGE_SECONDS):
+        return None
+
+    list_updated_at = user.get("list_updated_at")
+    if list_updated_at and list_updated_at > generated_at:
+        return None
+
+    return doc["tmdb_ids"][:limit]
+
+
+def precompute_user_recommendations(user_oids: List[ObjectId], limit: int = PRECOMPUTE_LIMIT) -> int:
+    """
+    Score every given user for both media types and bulk-upsert the
+    ranked ids. Returns the number of documents written.
+    """
+    generation = current_catalog_generation()
+    writes = []
+
+    # stamp with the time the lists are *read*, so a list change that
+    # lands while we score makes this result stale rather than hiding it
+    generated_at = datetime.utcnow()
+
+    users = users_collection.find(
+        {"_id": {"$in": list(user_oids)}},
+        {"my_list": 1, "preferred_genres": 1}
+    )
+
+    for user in users:
+        for media_type in ("movie", "tv"):
+            _, tfidf_model = _media_sources(media_type)
+
+            try:
+                ranked_ids = _rank_item_ids(
+                    user["_id"],
+                    _extract_ids(user.get("my_list", []), media_type),
+                    media_type,
+                    tfidf_model,
+                    limit,
+                    genres=user.get("preferred_genres") or ()
+                )
+            except Exception:
+                traceback.print_exc()
+                continue
+
+            writes.append(ReplaceOne(
+                {"user_id": user["_id"], "media_type": media_type},
+                {
+                    "user_id": user["_id"],
+                    "media_type": media_type,
+                    "tmdb_ids": ranked_ids,
+                    "limit": limit,
+                    "generation": generation,
+                    "generated_at": generated_at,
+                },
+                upsert=True,
+            ))
+
+    if writes:
+        user_recommendations_collection.bulk_write(writes, ordered=False)
+
+    return len(writes)
+
+
+def _als_ranked_ids(
+    als_model,
+    user: Dict[str, Any],
+    item_ids: List[int],
+    current_weights: Dict[int, float],
+    limit: int,
+) -> Optional[List[int]]:
+    """
+    Top ids from the factor model, or None when it knows none of the
+    user's items
+    """
+    signals = {tmdb_id: 1 for tmdb_id in item_ids}
+    signals.update(current_weights)
+
+    if not signals:
+        return None
+
+    vector = als_model.user_vector(str(user["_id"]), signals, user.get("list_updated_at"))
+    if vector is None:
+        return None
+
+    return list(als_model.recommend(vector, limit, exclude=signals))
+
+
+# --- SERVING DEADLINE ---
+# time the full pipeline (user load, scoring, document fetch) gets before
+# a request degrades, and the extra time the content-only tier may take
+RECOMMENDATION_BUDGET_MS = int(os.getenv("RECOMMENDATION_BUDGET_MS", 300))
+FALLBACK_BUDGET_MS = int(os.getenv("RECOMMENDATION_FALLBACK_BUDGET_MS", 100))
+
+# how long a cache hit waits for the user's list_updated_at before it is
+# served without the cross-worker freshness check
+STAMP_BUDGET_MS = int(os.getenv("RECOMMENDATION_STAMP_BUDGET_MS", 30))
+
+# best first: the configured engine, TF-IDF scores only, then the
+# in-memory per-genre popularity lists
+TIERS = ("full", "content", "popular")
+
+# runs the full pipeline so a request can stop waiting for it; work that
+# finishes late still fills the cache for the next request
+_deadline_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RECOMMENDATION_WORKERS", 16)),
+    thread_name_prefix="recommend-full"
+)
+
+# the content tier's document fetch; separate so full-tier jobs stuck on a
+# stall (the case that tier exists for) cannot occupy every worker
+_fallback_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RECOMMENDATION_FALLBACK_WORKERS", 4)),
+    thread_name_prefix="recommend-fallback"
+)
+
+
+class _Progress:
+    """
+    What the full pipeline has loaded so far, reused by the fallback tiers
+    """
+
+    def __init__(self):
+        self.user = None
+        self.weights = None
+
+
+def _full_recommendations(
+    user_oid: ObjectId,
+    media_types,
+    limit: int,
+    engine: str,
+    cache_key,
+    version: int,
+    progress: _Progress,
+) -> Dict[str, list]:
+    """
+    The user document and interactions are loaded once and shared; media
+    types are scored concurrently
+    """
+    user = users_collection.find_one(
+        {"_id": user_oid},
+        {"my_list": 1, "list_updated_at": 1, "preferred_genres": 1}
+    )
+    if not user:
+        return {media_type: [] for media_type in media_types}
+
+    progress.user = user
+
+    weights = _get_user_interactions_by_type(user_oid, media_types)
+    progress.weights = weights
+
+    def recommend(media_type: str):
+        collection, tfidf_model = _media_sources(media_type)
+        item_ids = _extract_ids(user.get("my_list", []), media_type)
+
+        if engine == "als":
+            als_model = artifact_registry.get(media_type).als
+            ranked_ids = None
+
+            if als_model is not None:
+                ranked_ids = _als_ranked_ids(als_model, user, item_ids, weights[media_type], limit)
+
+            if ranked_ids:
+                return _fetch_ordered(collection, ranked_ids)
+        else:
+            ranked_ids = _load_precomputed_ids(user, media_type, limit)
+
+            if ranked_ids is not None:
+                return _fetch_ordered(collection, ranked_ids)
 
         return _collaborative_recommendation(
             user_oid,
-            movie_ids,
-            "movie",
-            movies_collection,
-            movie_tfidf,
-            limit
+            item_ids,
+            media_type,
+            collection,
+            tfidf_model,
+            limit,
+            weights[media_type],
+            user.get("preferred_genres") or ()
         )
 
+    if len(media_types) == 1:
+        computed = {media_types[0]: recommend(media_types[0])}
+    else:
+        computed = dict(zip(media_types, _executor.map(recommend, media_types)))
+
+    for media_type, items in computed.items():
+        recommendation_cache.set(
+            str(user_oid), media_type, cache_key, items, version, user.get("list_updated_at")
+        )
+
+    return computed
+
+
+def _content_tier(user, weights, media_type: str, limit: int, deadline: float) -> Optional[list]:
+    """
+    Content-only ranking: in-memory TF-IDF scores, no collaborative stage
+    and no popularity lookups. None when it has nothing to offer.
+    """
+    collection, tfidf_model = _media_sources(media_type)
+    item_ids = _extract_ids(user.get("my_list", []), media_type)
+
+    # cold-start users get popular items from the full path too
+    if len(item_ids) < 3:
+        return None
+
+    current_weights = (weights or {}).get(media_type, {})
+
+    content_scores = _get_content_scores(item_ids, tfidf_model, current_weights, str(user["_id"]))
+    if not content_scores:
+        return None
+
+    ranked_ids = _blend(
+        artifact_registry.get(media_type).row_lookup,
+        {},
+        content_scores,
+        current_weights,
+        lambda ids: Counter(),
+        limit
+    )
+
+    future = _fallback_executor.submit(_fetch_ordered, collection, ranked_ids)
+
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeout:
+        future.cancel()
+        return None
+
+
+def _fallback_user(user_oid: ObjectId, deadline: float):
+    """
+    The user document for the fallback tiers when the full pipeline never
+    got to load it (still queued behind stalled jobs); None past the deadline
+    """
+    future = _fallback_executor.submit(
+        users_collection.find_one,
+        {"_id": user_oid},
+        {"my_list": 1, "preferred_genres": 1}
+    )
+
+    try:
+        return future.result(timeout=max(0, deadline - time.monotonic()))
+    except FutureTimeout:
+        future.cancel()
+        return None
+
+
+def _list_stamp(user_oid: ObjectId, deadline: float):
+    """
+    The user's list_updated_at, or None when Mongo does not answer in time
+    """
+    future = _fallback_executor.submit(
+        users_collection.find_one,
+        {"_id": user_oid},
+        {"_id": 0, "list_updated_at": 1}
+    )
+
+    try:
+        return (future.result(timeout=max(0, deadline - time.monotonic())) or {}).get("list_updated_at")
+    except FutureTimeout:
+        future.cancel()
+        return None
+
+
+def _popular_tier(user, media_type: str, limit: int) -> list:
+    if user is None:
+        return popular_lists.ranked(media_type, (), limit)
+
+    return popular_lists.ranked(
+        media_type,
+        user.get("preferred_genres") or (),
+        limit,
+        _extract_ids(user.get("my_list", []), media_type)
+    )
+
+
+def serve_user_recommendations(
+    user_id: Any,
+    media_types,
+    limit: int = 12,
+    engine: Optional[str] = None,
+    budget_ms: Optional[int] = None,
+) -> Tuple[Dict[str, list], str]:
+    """
+    Recommendations for one user across media types within a latency
+    budget, and the lowest tier that served any of them.
+
+    Cached rows are served as they are; the rest get the full pipeline
+    until the deadline, then the content-only tier, then popular lists.
+    """
+    user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+    user_key = str(user_oid)
+
+    engine = engine or RECOMMENDER_ENGINE
+    cache_key = (limit, engine)
+
+    budget = RECOMMENDATION_BUDGET_MS if budget_ms is None else budget_ms
+    deadline = time.monotonic() + budget / 1000
+
+    results = {}
+    missing = []
+
+    # list writes handled by other workers only show up in the user
+    # document; a slow read serves the cached rows unchecked
+    stamp = None
+    if recommendation_cache.has_user(user_key):
+        stamp_deadline = min(deadline, time.monotonic() + STAMP_BUDGET_MS / 1000)
+        try:
+            stamp = _list_stamp(user_oid, stamp_deadline)
+        except Exception:
+            traceback.print_exc()
+
+    for media_type in media_types:
+        cached = recommendation_cache.get(user_key, media_type, cache_key, stamp)
+        if cached is not None:
+            results[media_type] = cached
+        else:
+            missing.append(media_type)
+
+    if not missing:
+        return results, "full"
+
+    version = recommendation_cache.user_version(user_key)
+    progress = _Progress()
+
+    future = _deadline_executor.submit(
+        _full_recommendations,
+        user_oid,
+        tuple(missing),
+        limit,
+        engine,
+        cache_key,
+        version,
+        progress
+    )
+
+    try:
+        results.update(future.result(timeout=max(0, deadline - time.monotonic())))
+        return results, "full"
+
+    except FutureTimeout:
+        # not started yet: drop it instead of adding to the backlog
+        future.cancel()
+        reason = "timeout"
+
+    except Exception:
+        traceback.print_exc()
+        reason = "error"
+
+    tier = "content"
+    fallback_deadline = time.monotonic() + FALLBACK_BUDGET_MS / 1000
+
+    if progress.user is None:
+        try:
+            progress.user = _fallback_user(user_oid, fallback_deadline)
+        except Exception:
+            traceback.print_exc()
+
+    for media_type in missing:
+        serving_metrics.fallback(media_type, reason)
+
+        items = None
+        if progress.user is not None:
+            try:
+                items = _content_tier(progress.user, progress.weights, media_type, limit, fallback_deadline)
+            except Exception:
+                traceback.print_exc()
+
+        if items is None:
+            items = _popular_tier(progress.user, media_type, limit)
+            tier = "popular"
+
+        results[media_type] = items
+
+    return results, tier
+
+
+def generate_user_movie_recommendations(user_id: Any, limit: int = 12, engine: Optional[str] = None):
+    try:
+        return serve_user_recommendations(user_id, ("movie",), limit, engine)[0]["movie"]
+
     except Exception:
         traceback.print_exc()
         return []
 
 
-def generate_user_tv_recommendations(user_id: Any, limit: int = 12):
+def generate_user_tv_recommendations(user_id: Any, limit: int = 12, engine: Optional[str] = None):
     try:
-        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
-        user = users_collection.find_one({"_id": user_oid})
-        if not user:
-            return []
+        return serve_user_recommendations(user_id, ("tv",), limit, engine)[0]["tv"]
+
+    except Exception:
+        traceback.print_exc()
+        return []
 
-        tv_ids = _extract_ids(user.get("my_list", []), "tv")
 
-        return _collaborative_recommendation(
-            user_oid,
-            tv_ids,
-            "tv",
-            tv_collection,
-            tv_tfidf,
-            limit
-        )
+def generate_user_recommendations(user_id: Any, limit: int = 12, engine: Optional[str] = None):
+    """
+    Both rows in one call: {"movies": [...], "tv": [...]}
+    """
+    try:
+        results = serve_user_recommendations(user_id, ("movie", "tv"), limit, engine)[0]
+        return {"movies": results["movie"], "tv": results["tv"]}
 
     except Exception:
         traceback.print_exc()
-        return []
\ No newline at end of file
+        return {"movies": [], "tv": []}
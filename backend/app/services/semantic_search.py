@@ -0,0 +1,88 @@
+from app.db import movies_collection, tv_collection
+from app.services.artifact_registry import artifact_registry
+from app.services.content_artifacts import clean_text
+from sklearn.preprocessing import normalize
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import heapq
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+SEMANTIC_SEARCH_LIMIT = 20
+SEMANTIC_SEARCH_MAX_LIMIT = 50
+
+# longer queries are cut; the vectorizer only needs the words
+MAX_QUERY_LENGTH = 200
+
+
+def _collection(media_type: str):
+    return movies_collection if media_type == "movie" else tv_collection
+
+
+def _media_matches(query: str, media_type: str, limit: int) -> List[Tuple[float, int]]:
+    """
+    (score, tmdb_id) of the best `limit` titles of one media type: the
+    query in that version's TF-IDF space, one sparse mat-vec against its
+    L2-normalized matrix (plus titles folded in since the build)
+    """
+    artifacts = artifact_registry.get(media_type)
+
+    vectorizer = artifacts.delta.vectorizer()
+    if vectorizer is None:
+        return []
+
+    vector = normalize(vectorizer.transform([query])).tocsr()
+    if vector.nnz == 0:
+        return []
+
+    scores = (artifacts.matrix @ vector.T).toarray().ravel()
+
+    k = min(limit, len(scores))
+    if k <= 0:
+        return []
+
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[scores[top] > 0]
+
+    matches = {int(artifacts.index_to_tmdb[i]): float(scores[i]) for i in top}
+    matches = artifacts.delta.extend(vector, matches, limit)
+
+    return [(score, tmdb_id) for tmdb_id, score in matches.items()]
+
+
+def semantic_search(query: str, media_types=MEDIA_TYPES, limit: int = SEMANTIC_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Catalog documents whose title, overview and genres best match the
+    free-text query, movies and TV ranked together by cosine, each with
+    "media_type" and "score"
+    """
+    query = clean_text(query[:MAX_QUERY_LENGTH])
+    if not query:
+        return []
+
+    ranked = heapq.nlargest(
+        limit,
+        (
+            (score, media_type, tmdb_id)
+            for media_type in media_types
+            for score, tmdb_id in _media_matches(query, media_type, limit)
+        ),
+        key=lambda match: (match[0], -match[2]),
+    )
+
+    results = []
+
+    for media_type in media_types:
+        scores = {tmdb_id: score for score, mt, tmdb_id in ranked if mt == media_type}
+        if not scores:
+            continue
+
+        for doc in _collection(media_type).find({"tmdb_id": {"$in": list(scores)}}, {"_id": 0}):
+            doc["media_type"] = media_type
+            doc["score"] = round(scores[doc["tmdb_id"]], 4)
+            results.append(doc)
+
+    results.sort(key=lambda d: (-d["score"], d["tmdb_id"]))
+
+    return results
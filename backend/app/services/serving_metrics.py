@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Tuple
+import threading
+import time
+
+
+# upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class ServingMetrics:
+    """
+    Request counters and latency histograms of the user recommendation
+    routes per (endpoint, tier), time per pipeline stage, and fallback
+    counts per reason. Exported in the Prometheus text format by
+    /api/metrics.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+
+        self._lock = threading.Lock()
+        # (endpoint, tier) -> [per-bucket counts (last one is +Inf), count, sum]
+        self._latency: Dict[Tuple[str, str], List[Any]] = {}
+        # stage -> same layout
+        self._stages: Dict[str, List[Any]] = {}
+        # (media_type, reason) -> count
+        self._fallbacks: Dict[Tuple[str, str], int] = {}
+
+    def _add(self, histograms: Dict[Any, List[Any]], key, seconds: float):
+        bucket = bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            series = histograms.get(key)
+            if series is None:
+                series = histograms[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+
+            series[0][bucket] += 1
+            series[1] += 1
+            series[2] += seconds
+
+    def observe(self, endpoint: str, tier: str, seconds: float):
+        self._add(self._latency, (endpoint, tier), seconds)
+
+    def stage(self, stage: str, seconds: float):
+        self._add(self._stages, stage, seconds)
+
+    def fallback(self, media_type: str, reason: str):
+        with self._lock:
+            key = (media_type, reason)
+            self._fallbacks[key] = self._fallbacks.get(key, 0) + 1
+
+    # --- EXPORT ---
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": {
+                    f"{endpoint}:{tier}": {"count": count, "sum_seconds": round(total, 6)}
+                    for (endpoint, tier), (_, count, total) in self._latency.items()
+                },
+                "stages": {
+                    stage: {"count": count, "sum_seconds": round(total, 6)}
+                    for stage, (_, count, total) in self._stages.items()
+                },
+                "fallbacks": {
+                    f"{media_type}:{reason}": count
+                    for (media_type, reason), count in self._fallbacks.items()
+                },
+            }
+
+    def _histogram(self, name: str, labels: str, series: Tuple[List[int], int, float]) -> List[str]:
+        counts, count, total = series
+        lines = []
+        cumulative = 0
+
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {total:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {count}")
+
+        return lines
+
+    def render(self) -> str:
+        lines = [
+            "# HELP recommendation_requests_total User recommendation requests by serving tier.",
+            "# TYPE recommendation_requests_total counter",
+        ]
+
+        with self._lock:
+            latency = {key: (list(counts), count, total) for key, (counts, count, total) in self._latency.items()}
+            stages = {key: (list(counts), count, total) for key, (counts, count, total) in self._stages.items()}
+            fallbacks = dict(self._fallbacks)
+
+        for (endpoint, tier), (_, count, _) in sorted(latency.items()):
+            lines.append(f'recommendation_requests_total{{endpoint="{endpoint}",tier="{tier}"}} {count}')
+
+        lines += [
+            "# HELP recommendation_latency_seconds User recommendation latency by serving tier.",
+            "# TYPE recommendation_latency_seconds histogram",
+        ]
+
+        for (endpoint, tier), series in sorted(latency.items()):
+            lines += self._histogram("recommendation_latency_seconds", f'endpoint="{endpoint}",tier="{tier}"', series)
+
+        lines += [
+            "# HELP recommendation_stage_seconds Time per stage of the hybrid pipeline.",
+            "# TYPE recommendation_stage_seconds histogram",
+        ]
+
+        for stage, series in sorted(stages.items()):
+            lines += self._histogram("recommendation_stage_seconds", f'stage="{stage}"', series)
+
+        lines += [
+            "# HELP recommendation_fallbacks_total Media rows served below the full tier, by reason.",
+            "# TYPE recommendation_fallbacks_total counter",
+        ]
+
+        for (media_type, reason), count in sorted(fallbacks.items()):
+            lines.append(f'recommendation_fallbacks_total{{media_type="{media_type}",reason="{reason}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Records the time since the previous lap under each stage name
+    """
+
+    def __init__(self, metrics: ServingMetrics):
+        self._metrics = metrics
+        self._last = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = now - self._last
+        self._metrics.stage(stage, now - self._last)
+        self._last = now
+
+
+serving_metrics = ServingMetrics()
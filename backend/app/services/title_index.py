@@ -0,0 +1,303 @@
+from app.db import movies_collection, tv_collection
+from app.services.generation import current_catalog_generation
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import unicodedata
+import threading
+import traceback
+import heapq
+import time
+import re
+import os
+
+
+MEDIA_TYPES = ("movie", "tv")
+
+# share of the query's trigrams a title must contain to match at all
+MIN_COVERAGE = float(os.getenv("TITLE_SEARCH_MIN_COVERAGE", 0.5))
+
+# how much popularity can lift a match, relative to its text similarity
+POPULARITY_WEIGHT = float(os.getenv("TITLE_SEARCH_POPULARITY_WEIGHT", 0.15))
+
+# prefixes up to this length have their ranked completions precomputed
+SHORT_PREFIX = 3
+COMPLETIONS_KEPT = 20
+
+# fields returned by autocomplete
+SUGGESTION_FIELDS = ("tmdb_id", "title", "year", "poster_path")
+
+
+def normalize_title(text: str) -> str:
+    """
+    Lowercase ASCII words: accents stripped, punctuation dropped
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return text.strip()
+
+
+def trigrams(normalized: str) -> List[str]:
+    """
+    Character trigrams of every word, padded so word starts and ends (and
+    words shorter than three letters) count
+    """
+    grams = (
+        padded[i:i + 3]
+        for word in normalized.split()
+        for padded in (f"  {word} ",)
+        for i in range(len(padded) - 2)
+    )
+    return list(dict.fromkeys(grams))
+
+
+def inner_trigrams(normalized: str) -> List[str]:
+    """
+    Unpadded trigrams of a query: a title containing the query anywhere,
+    mid-word included, has all of them
+    """
+    grams = []
+    for word in normalized.split():
+        if len(word) < 3:
+            grams.append(f" {word}" if len(word) == 2 else f"  {word}")
+        else:
+            grams += [word[i:i + 3] for i in range(len(word) - 2)]
+    return list(dict.fromkeys(grams))
+
+
+def _collection(media_type: str):
+    return movies_collection if media_type == "movie" else tv_collection
+
+
+class _Index:
+    def __init__(self, generation: int, docs: List[Dict[str, Any]], media: np.ndarray, postings: Dict[str, np.ndarray], gram_counts: np.ndarray, boost: np.ndarray, prefixes: List[Tuple[str, int]], short: Dict[str, List[int]], seconds: float):
+        self.generation = generation
+        self.docs = docs
+        self.media = media
+        self.postings = postings
+        self.gram_counts = gram_counts
+        self.boost = boost
+        self.prefix_keys = [key for key, _ in prefixes]
+        self.prefix_entries = [entry for _, entry in prefixes]
+        self.short = short
+        self.seconds = seconds
+        self.built_at = time.time()
+
+
+class TitleIndex:
+    """
+    In-process title search over movies and TV.
+
+    Trigram postings give typo-tolerant ranked matches (how much of the
+    query a title covers, blended with trigram Jaccard, lifted by
+    popularity). A sorted table of every word start of every title
+    answers prefix autocomplete. Built at startup and rebuilt in the
+    background whenever a reseed moves the catalog generation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[_Index] = None
+        self._rebuilding = False
+
+    # --- BUILD ---
+    def rebuild(self) -> _Index:
+        started = time.perf_counter()
+        generation = current_catalog_generation()
+
+        docs, media = [], []
+        for media_index, media_type in enumerate(MEDIA_TYPES):
+            for doc in _collection(media_type).find({}, {"_id": 0}):
+                docs.append(doc)
+                media.append(media_index)
+
+        grams: Dict[str, List[int]] = {}
+        gram_counts = np.zeros(len(docs), dtype=np.int32)
+        prefixes = []
+
+        for entry, doc in enumerate(docs):
+            normalized = normalize_title(doc.get("title", ""))
+
+            entry_grams = trigrams(normalized)
+            gram_counts[entry] = len(entry_grams)
+            for gram in entry_grams:
+                grams.setdefault(gram, []).append(entry)
+
+            # every word start, so "wars" completes "Star Wars"
+            words = normalized.split()
+            for i in range(len(words)):
+                prefixes.append((" ".join(words[i:]), entry))
+
+        popularity = np.log1p(np.array([max(doc.get("popularity") or 0, 0) for doc in docs], dtype=np.float64))
+        if len(popularity) and popularity.max() > 0:
+            popularity /= popularity.max()
+        boost = 1 + POPULARITY_WEIGHT * popularity
+
+        prefixes.sort()
+
+        # short prefixes match too many titles to rank per keystroke
+        short: Dict[str, List[int]] = {}
+        for key, entry in prefixes:
+            for length in range(1, min(SHORT_PREFIX, len(key)) + 1):
+                short.setdefault(key[:length], []).append(entry)
+        short = {
+            prefix: heapq.nlargest(COMPLETIONS_KEPT, dict.fromkeys(entries), key=lambda e: (boost[e], -e))
+            for prefix, entries in short.items()
+        }
+
+        index = _Index(
+            generation,
+            docs,
+            np.asarray(media, dtype=np.int8),
+            {gram: np.asarray(entries, dtype=np.int32) for gram, entries in grams.items()},
+            gram_counts,
+            boost,
+            prefixes,
+            short,
+            time.perf_counter() - started,
+        )
+
+        with self._lock:
+            self._index = index
+
+        return index
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def warm(self):
+        try:
+            self.rebuild()
+        except Exception:
+            traceback.print_exc()
+
+    def _current(self) -> _Index:
+        with self._lock:
+            index = self._index
+
+            # after a reseed keep answering from the old index until the new one exists
+            stale = index is not None and index.generation != current_catalog_generation()
+            if stale and not self._rebuilding:
+                self._rebuilding = True
+                threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+        if index is None:
+            return self.rebuild()
+
+        return index
+
+    def _media_mask(self, index: _Index, media_types: Iterable[str]) -> Optional[np.ndarray]:
+        wanted = [MEDIA_TYPES.index(m) for m in media_types]
+        if len(wanted) == len(MEDIA_TYPES):
+            return None
+        return np.isin(index.media, wanted)
+
+    # --- SEARCH ---
+    def _shared(self, index: _Index, grams: List[str]) -> np.ndarray:
+        """
+        How many of `grams` each title has
+        """
+        lists = [index.postings[g] for g in grams if g in index.postings]
+        if not lists:
+            return np.zeros(len(index.docs), dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=len(index.docs))
+
+    def search(self, query: str, media_types: Iterable[str] = MEDIA_TYPES, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Best title matches for a possibly misspelled query, best first
+        """
+        index = self._current()
+
+        normalized = normalize_title(query)
+        query_grams = trigrams(normalized)
+        if not query_grams or not index.docs:
+            return []
+
+        shared = self._shared(index, query_grams)
+        inner = inner_trigrams(normalized)
+        inner_shared = self._shared(index, inner)
+
+        # substring hits cover every inner trigram, typos keep most padded ones
+        coverage = np.maximum(shared / len(query_grams), inner_shared / len(inner))
+        candidates = np.flatnonzero(coverage >= MIN_COVERAGE)
+
+        mask = self._media_mask(index, media_types)
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+
+        if not len(candidates):
+            return []
+
+        common = shared[candidates]
+        jaccard = common / (len(query_grams) + index.gram_counts[candidates] - common)
+
+        score = (0.7 * coverage[candidates] + 0.3 * jaccard) * index.boost[candidates]
+
+        k = min(limit, len(candidates))
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.lexsort((candidates[top], -score[top]))]
+
+        return [index.docs[e] for e in candidates[top]]
+
+    def suggest(self, prefix: str, media_types: Iterable[str] = MEDIA_TYPES, limit: int = 8) -> List[Dict[str, Any]]:
+        """
+        Titles with a word starting with `prefix`, most popular first
+        """
+        index = self._current()
+
+        key = normalize_title(prefix)
+        if not key:
+            return []
+
+        mask = self._media_mask(index, media_types)
+
+        if len(key) <= SHORT_PREFIX and key in index.short:
+            entries = index.short[key]
+        else:
+            start = bisect_left(index.prefix_keys, key)
+            end = bisect_left(index.prefix_keys, key + "\x7f", start)
+            entries = heapq.nlargest(
+                COMPLETIONS_KEPT,
+                dict.fromkeys(index.prefix_entries[start:end]),
+                key=lambda e: (index.boost[e], -e)
+            )
+
+        suggestions = []
+        for entry in entries:
+            if mask is not None and not mask[entry]:
+                continue
+
+            doc = index.docs[entry]
+            suggestion = {field: doc.get(field) for field in SUGGESTION_FIELDS}
+            suggestion["media_type"] = MEDIA_TYPES[index.media[entry]]
+            suggestions.append(suggestion)
+
+            if len(suggestions) >= limit:
+                break
+
+        return suggestions
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._index
+
+        if index is None:
+            return {}
+
+        return {
+            "generation": index.generation,
+            "titles": len(index.docs),
+            "trigrams": len(index.postings),
+            "prefix_keys": len(index.prefix_keys),
+            "build_seconds": round(index.seconds, 3),
+        }
+
+
+title_index = TitleIndex()
@@ -0,0 +1,304 @@
+from typing import Dict, Iterable, List, Optional
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+
+# Rows replaced since the last compaction are kept in a small overlay;
+# past this many the overlay is folded back into the CSR base.
+COMPACT_THRESHOLD = 2048
+
+
+class UserItemMatrix:
+    """
+    In-memory user x item matrix for one media type.
+
+    Cell values are interaction weights (seen/like/love, 1 when the item is
+    only in My List). The bulk of the data lives in an immutable CSR base;
+    users whose list changed live in `_overlay` until the next compaction,
+    so updates are applied in place without rebuilding the whole matrix.
+    """
+
+    def __init__(self, media_type: str):
+        self.media_type = media_type
+
+        self._lock = threading.RLock()
+
+        self._user_rows: Dict[str, int] = {}
+        self._user_keys: List[str] = []
+        self._item_cols: Dict[int, int] = {}
+        self._item_ids: List[int] = []
+
+        self._base = sp.csr_matrix((0, 0), dtype=np.float64)
+        self._base_binary = self._base.copy()
+        self._base_sizes = np.zeros(0, dtype=np.float64)
+
+        self._overlay: Dict[int, Dict[int, float]] = {}
+
+    # --- BUILD ---
+    @classmethod
+    def from_rows(cls, media_type: str, rows: Dict[str, Dict[int, float]]) -> "UserItemMatrix":
+        matrix = cls(media_type)
+
+        indptr = [0]
+        indices = []
+        data = []
+
+        for user_key, items in rows.items():
+            matrix._user_rows[user_key] = len(matrix._user_keys)
+            matrix._user_keys.append(user_key)
+
+            for tmdb_id, weight in items.items():
+                indices.append(matrix._col(tmdb_id))
+                data.append(weight)
+
+            indptr.append(len(indices))
+
+        matrix._set_base(
+            sp.csr_matrix(
+                (
+                    np.asarray(data, dtype=np.float64),
+                    np.asarray(indices, dtype=np.int32),
+                    np.asarray(indptr, dtype=np.int64),
+                ),
+                shape=(len(matrix._user_rows), len(matrix._item_ids)),
+            )
+        )
+
+        return matrix
+
+    def _set_base(self, base: sp.csr_matrix):
+        base.sum_duplicates()
+        base.eliminate_zeros()
+
+        binary = base.copy()
+        binary.data[:] = 1.0
+
+        self._base = base
+        self._base_binary = binary
+        self._base_sizes = np.diff(base.indptr).astype(np.float64)
+
+    def _col(self, tmdb_id: int) -> int:
+        col = self._item_cols.get(tmdb_id)
+        if col is None:
+            col = len(self._item_ids)
+            self._item_cols[tmdb_id] = col
+            self._item_ids.append(tmdb_id)
+        return col
+
+    # --- UPDATES ---
+    def set_user(self, user_key: str, items: Dict[int, float]):
+        """
+        Replace one user's row (an empty dict clears it)
+        """
+        with self._lock:
+            row = self._user_rows.get(user_key)
+            if row is None:
+                row = len(self._user_keys)
+                self._user_rows[user_key] = row
+                self._user_keys.append(user_key)
+
+            self._overlay[row] = {
+                self._col(tmdb_id): float(weight)
+                for tmdb_id, weight in items.items()
+            }
+
+            if len(self._overlay) > COMPACT_THRESHOLD:
+                self.compact()
+
+    def compact(self):
+        with self._lock:
+            n_users = len(self._user_keys)
+            n_items = len(self._item_ids)
+
+            keep = np.ones(self._base.shape[0], dtype=np.float64)
+            for row in self._overlay:
+                if row < keep.shape[0]:
+                    keep[row] = 0.0
+
+            base = (sp.diags(keep) @ self._base).tocsr()
+            base.resize((n_users, n_items))
+
+            rows, cols, data = [], [], []
+            for row, items in self._overlay.items():
+                for col, weight in items.items():
+                    rows.append(row)
+                    cols.append(col)
+                    data.append(weight)
+
+            overlay = sp.csr_matrix(
+                (data, (rows, cols)),
+                shape=(n_users, n_items),
+                dtype=np.float64,
+            )
+
+            self._set_base((base + overlay).tocsr())
+            self._overlay = {}
+
+    # --- SCORING ---
+    def _candidate_rows(self, candidates: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if candidates is None:
+            return None
+
+        rows = {self._user_rows[k] for k in candidates if k in self._user_rows}
+        return np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+
+    def _similarities(
+        self,
+        user_key: Optional[str],
+        current: set,
+        weights: Dict[int, float],
+        rows: Optional[np.ndarray] = None,
+    ):
+        """
+        Weighted-Jaccard similarity of the given list to every user row
+        (or only to `rows`; the others stay 0):
+
+            sim(u, v) = sum(w_u[i] for i in U & V) / |U | V|
+
+        Returns (sim per row, query indicator over item columns).
+        Caller holds the lock.
+        """
+        n_items = len(self._item_ids)
+        n_users = len(self._user_keys)
+        base_users, base_items = self._base.shape
+
+        x = np.zeros(n_items, dtype=np.float64)
+        c = np.zeros(n_items, dtype=np.float64)
+        for tmdb_id in current:
+            col = self._item_cols.get(tmdb_id)
+            if col is not None:
+                x[col] = weights.get(tmdb_id, 1)
+                c[col] = 1.0
+
+        if rows is None:
+            target = slice(0, base_users)
+            binary = self._base_binary
+            overlay_rows = self._overlay.keys()
+        else:
+            target = rows[rows < base_users]
+            binary = self._base_binary[target]
+            overlay_rows = [row for row in rows.tolist() if row in self._overlay]
+
+        # intersections with every (candidate) base user in two mat-vecs
+        weighted_inter = np.zeros(n_users, dtype=np.float64)
+        inter = np.zeros(n_users, dtype=np.float64)
+        sizes = np.zeros(n_users, dtype=np.float64)
+
+        weighted_inter[target] = binary @ x[:base_items]
+        inter[target] = binary @ c[:base_items]
+        sizes[target] = self._base_sizes[target]
+
+        for row in overlay_rows:
+            items = self._overlay[row]
+            cols = np.fromiter(items.keys(), dtype=np.int64, count=len(items))
+            weighted_inter[row] = x[cols].sum()
+            inter[row] = c[cols].sum()
+            sizes[row] = len(items)
+
+        union = len(current) + sizes - inter
+        sim = np.divide(
+            weighted_inter,
+            union,
+            out=np.zeros(n_users, dtype=np.float64),
+            where=inter > 0,
+        )
+
+        self_row = self._user_rows.get(user_key) if user_key else None
+        if self_row is not None:
+            sim[self_row] = 0.0
+
+        return sim, c
+
+    def similar_users(
+        self,
+        user_key: Optional[str],
+        item_ids: Iterable[int],
+        weights: Dict[int, float],
+        top_n: int,
+    ) -> List[tuple]:
+        """
+        Exact top-N most similar users as [(user_key, similarity)]
+        """
+        with self._lock:
+            current = set(item_ids)
+            if not current or not self._user_keys:
+                return []
+
+            sim, _ = self._similarities(user_key, current, weights)
+
+            top_n = min(top_n, len(sim))
+            top = np.argpartition(-sim, top_n - 1)[:top_n]
+            top = top[np.argsort(-sim[top])]
+
+            return [
+                (self._user_keys[row], float(sim[row]))
+                for row in top
+                if sim[row] > 0
+            ]
+
+    def collaborative_scores(
+        self,
+        user_key: Optional[str],
+        item_ids: Iterable[int],
+        weights: Dict[int, float],
+        candidates: Optional[Iterable[str]] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[int, float]:
+        """
+        Candidate scores as the similarity-weighted sum of every other
+        user's items (or only of the `candidates` users), the `top_k`
+        best when given:
+
+            score(i) = sum(sim(u, v) for v holding i), i not in U
+        """
+        with self._lock:
+            current = set(item_ids)
+            if not current:
+                return {}
+
+            rows = self._candidate_rows(candidates)
+            sim, c = self._similarities(user_key, current, weights, rows)
+
+            base_users, base_items = self._base.shape
+
+            # overlay rows must not also contribute through their stale base row
+            stale = np.fromiter(
+                (row for row in self._overlay if row < base_users),
+                dtype=np.int64,
+            )
+
+            if rows is None:
+                binary = self._base_binary
+                base_sim = sim[:base_users].copy()
+                base_sim[stale] = 0.0
+            else:
+                target = rows[rows < base_users]
+                binary = self._base_binary[target]
+                base_sim = sim[target]
+                base_sim[np.isin(target, stale)] = 0.0
+
+            scores = np.zeros(len(self._item_ids), dtype=np.float64)
+            scores[:base_items] = binary.T @ base_sim
+
+            for row, items in self._overlay.items():
+                if sim[row] > 0:
+                    cols = np.fromiter(items.keys(), dtype=np.int64, count=len(items))
+                    scores[cols] += sim[row]
+
+            scores[c > 0] = 0.0
+
+            nonzero = np.flatnonzero(scores)
+
+            if top_k is not None and len(nonzero) > top_k:
+                order = np.lexsort((nonzero, -scores[nonzero]))
+                nonzero = nonzero[order[:top_k]]
+
+            return {
+                self._item_ids[col]: float(scores[col])
+                for col in nonzero
+            }
+
+    @property
+    def shape(self):
+        return (len(self._user_keys), len(self._item_ids))
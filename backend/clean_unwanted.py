@@ -1,4 +1,5 @@
 from app.db import movies_collection, tv_collection
+from app.services.generation import bump_catalog_generation
 
 # ------------------------
 # TARGETS
@@ -29,6 +30,8 @@ def run():
     print("\nRemoving TV shows...")
     delete_by_titles(tv_collection, TV_TO_REMOVE)
 
+    bump_catalog_generation()
+
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
@@ -0,0 +1,100 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ------------------------
+# Precomputes movie + TV recommendations for every user (or only users
+# whose list changed since their last run) across a process pool and
+# bulk-writes the ranked ids to the user_recommendations collection.
+# The /api/user_recommendations routes serve these until they go stale.
+#
+#   python precompute_recommendations.py                # everyone
+#   python precompute_recommendations.py --changed      # changed subset
+#   python precompute_recommendations.py --workers 8 --chunk-size 500
+# ------------------------
+
+
+def _precompute_chunk(user_ids, limit):
+    # imported in the worker: every process needs its own MongoClient
+    from app.services.recommendation_service import precompute_user_recommendations
+
+    return precompute_user_recommendations(user_ids, limit)
+
+
+def _select_users(changed_only: bool):
+    from app.db import users_collection, user_recommendations_collection
+    from app.services.generation import current_catalog_generation
+
+    users = users_collection.find({}, {"_id": 1, "list_updated_at": 1}, batch_size=5000)
+
+    if not changed_only:
+        return [u["_id"] for u in users]
+
+    generation = current_catalog_generation()
+    last_run = {}
+
+    for doc in user_recommendations_collection.find(
+        {},
+        {"_id": 0, "user_id": 1, "generated_at": 1, "generation": 1},
+        batch_size=5000,
+    ):
+        if doc.get("generation") != generation:
+            continue
+
+        previous = last_run.get(doc["user_id"])
+        if previous is None or doc["generated_at"] < previous:
+            last_run[doc["user_id"]] = doc["generated_at"]
+
+    selected = []
+
+    for u in users:
+        generated_at = last_run.get(u["_id"])
+        updated_at = u.get("list_updated_at")
+
+        if generated_at is None or (updated_at and updated_at > generated_at):
+            selected.append(u["_id"])
+
+    return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute user recommendations")
+    parser.add_argument("--changed", action="store_true", help="only users whose list changed since their last run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--limit", type=int, default=None, help="ids stored per user and media type")
+    args = parser.parse_args()
+
+    from app.services.recommendation_service import PRECOMPUTE_LIMIT
+
+    limit = args.limit or PRECOMPUTE_LIMIT
+    started = time.time()
+
+    user_ids = _select_users(args.changed)
+    chunks = [
+        user_ids[i:i + args.chunk_size]
+        for i in range(0, len(user_ids), args.chunk_size)
+    ]
+
+    print(f"Precomputing {len(user_ids)} users in {len(chunks)} chunks on {args.workers} workers...")
+
+    written = 0
+
+    # spawn, not fork: a forked MongoClient is not safe to reuse
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [executor.submit(_precompute_chunk, chunk, limit) for chunk in chunks]
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            written += future.result()
+            print(f"  {done}/{len(chunks)} chunks, {written} lists written")
+
+    print(f"✓ Precompute completed in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
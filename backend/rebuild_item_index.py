@@ -0,0 +1,10 @@
+from app.services.item_index_service import rebuild_item_index
+
+# ------------------------
+# Rebuilds the item -> users index from every user's My List.
+# The app keeps it up to date incrementally and repairs it in the
+# background; run this after manual DB edits or a restore.
+# ------------------------
+
+if __name__ == "__main__":
+    rebuild_item_index()
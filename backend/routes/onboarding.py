@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
 from app.auth.auth_utils import get_current_user_id
+from app.services.list_events import on_list_changed
 from app.db import movies_collection, tv_collection, users_collection, interactions_collection
 from bson import ObjectId
 from datetime import datetime
@@ -133,4 +134,6 @@ def complete_onboarding():
         update_data
     )
 
+    on_list_changed(ObjectId(user_id), added=my_list_items)
+
     return jsonify({"success": True})
\ No newline at end of file
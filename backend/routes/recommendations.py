@@ -1,28 +1,14 @@
-import json
-import joblib
 import numpy as np
 from flask import Blueprint, jsonify
-from sklearn.metrics.pairwise import cosine_similarity
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
+from app.services.artifact_registry import artifact_registry
+from app.services.content_artifacts import EmbeddingIndex
 
 bp = Blueprint("recommendations", __name__)
 
-# ------------------------
-# LOAD ARTIFACTS (ONCE)
-# ------------------------
-vectorizer = joblib.load("./artifacts/tfidf_vectorizer.joblib")
-tfidf_matrix = joblib.load("./artifacts/tfidf_matrix.joblib")
-
-with open("./artifacts/tfidf_index_to_tmdb.json") as f:
-    index_to_tmdb = json.load(f)
-
-tv_vectorizer = joblib.load("./artifacts/tv_vectorizer.joblib")
-tv_tfidf_matrix = joblib.load("./artifacts/tv_tfidf_matrix.joblib")
-
-with open("./artifacts/tv_index_to_tmdb.json") as f:
-    tv_index_to_tmdb = json.load(f)
+RECOMMENDATION_LIMIT = 10
 
 # ------------------------
 # DB
@@ -33,79 +19,90 @@ movies_collection = db["movies"]
 tv_collection = db["tv_shows"]
 
 # ------------------------
-# ROUTE
+# HELPERS
 # ------------------------
-@bp.route("/api/recommendations/movie/<int:tmdb_id>")
-def recommend_for_movie(tmdb_id):
-    if tmdb_id not in index_to_tmdb:
-        return jsonify([])
-
-    idx = index_to_tmdb.index(tmdb_id)
-
-    similarities = cosine_similarity(
-        tfidf_matrix[idx], tfidf_matrix
-    ).flatten()
+def _similar_items(tmdb_id, artifacts, limit=RECOMMENDATION_LIMIT):
+    """
+    Top `limit` most similar items as {tmdb_id: score}, best first
+    """
+    idx = artifacts.tmdb_to_index.get(tmdb_id)
+    if idx is None:
+        # seeded after the last build: folded in with the loaded vectorizer
+        return artifacts.delta.similar(tmdb_id, limit)
+
+    # dense deployments: one BLAS matrix-vector product over the embeddings
+    model = artifacts.content_model
+    if isinstance(model, EmbeddingIndex):
+        return model.similar(tmdb_id, limit)
+
+    neighbors = artifacts.neighbors
+    if neighbors is not None and idx < len(neighbors[0]):
+        ids, scores = neighbors
+        similar = {
+            int(i): float(score)
+            for i, score in zip(ids[idx][:limit], scores[idx][:limit])
+            if i >= 0
+        }
+        return artifacts.delta.extend(artifacts.matrix[idx], similar, limit)
+
+    # live fallback: rows are L2-normalized, so the sparse dot is the cosine
+    matrix = artifacts.matrix
+    similarities = (matrix @ matrix[idx].T).toarray().ravel()
 
     # Exclude itself
-    similarities[idx] = 0
+    similarities[idx] = -1
+
+    limit = min(limit, len(similarities) - 1)
+    if limit <= 0:
+        return {}
 
-    top_indices = np.argsort(similarities)[-10:][::-1]
+    top_indices = np.argpartition(-similarities, limit - 1)[:limit]
+    top_indices = top_indices[np.argsort(-similarities[top_indices])]
 
-    tmdb_with_scores = {
-        index_to_tmdb[i]: float(similarities[i])
+    similar = {
+        int(artifacts.index_to_tmdb[i]): float(similarities[i])
         for i in top_indices
     }
-    recommended_tmdb_ids = list(tmdb_with_scores.keys())
+    return artifacts.delta.extend(matrix[idx], similar, limit)
 
 
-    movies = list(
-        movies_collection.find(
-            {"tmdb_id": {"$in": recommended_tmdb_ids}},
+def _with_similarity(collection, tmdb_with_scores):
+    docs = list(
+        collection.find(
+            {"tmdb_id": {"$in": list(tmdb_with_scores.keys())}},
             {"_id": 0},
         )
     )
 
-    for movie in movies:
-        movie["similarity"] = round(tmdb_with_scores[movie["tmdb_id"]], 3)
+    for doc in docs:
+        doc["similarity"] = round(tmdb_with_scores[doc["tmdb_id"]], 3)
 
     # Preserve ranking order
-    movies.sort(key=lambda m: m["similarity"], reverse=True)
+    docs.sort(key=lambda d: d["similarity"], reverse=True)
 
-    return jsonify(movies)
+    return docs
 
-@bp.route("/api/recommendations/tv/<int:tmdb_id>")
-def recommend_for_tv(tmdb_id):
+# ------------------------
+# ROUTE
+# ------------------------
+@bp.route("/api/recommendations/movie/<int:tmdb_id>")
+def recommend_for_movie(tmdb_id):
+    tmdb_with_scores = _similar_items(tmdb_id, artifact_registry.get("movie"))
 
-    if tmdb_id not in tv_index_to_tmdb:
+    if not tmdb_with_scores:
         return jsonify([])
 
-    idx = tv_index_to_tmdb.index(tmdb_id)
-
-    similarities = cosine_similarity(
-        tv_tfidf_matrix[idx], tv_tfidf_matrix
-    ).flatten()
-
-    similarities[idx] = 0
-
-    top_indices = np.argsort(similarities)[-10:][::-1]
-
-    tmdb_with_scores = {
-        tv_index_to_tmdb[i]: float(similarities[i])
-        for i in top_indices
-    }
-
-    recommended_tmdb_ids = list(tmdb_with_scores.keys())
+    return jsonify(_with_similarity(movies_collection, tmdb_with_scores))
 
-    shows = list(
-        tv_collection.find(
-            {"tmdb_id": {"$in": recommended_tmdb_ids}},
-            {"_id": 0},
-        )
-    )
+@bp.route("/api/recommendations/tv/<int:tmdb_id>")
+def recommend_for_tv(tmdb_id):
+    tmdb_with_scores = _similar_items(tmdb_id, artifact_registry.get("tv"))
 
-    for show in shows:
-        show["similarity"] = round(tmdb_with_scores[show["tmdb_id"]], 3)
+    if not tmdb_with_scores:
+        return jsonify([])
 
-    shows.sort(key=lambda m: m["similarity"], reverse=True)
+    return jsonify(_with_similarity(tv_collection, tmdb_with_scores))
 
-    return jsonify(shows)
\ No newline at end of file
+@bp.route("/api/recommendations/artifacts")
+def artifact_status():
+    return jsonify(artifact_registry.status())
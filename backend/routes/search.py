@@ -0,0 +1,63 @@
+from flask import Blueprint, jsonify, request
+from app.services.semantic_search import (
+    MEDIA_TYPES,
+    SEMANTIC_SEARCH_LIMIT,
+    SEMANTIC_SEARCH_MAX_LIMIT,
+    semantic_search,
+)
+from app.services.title_index import title_index
+
+bp = Blueprint("search", __name__, url_prefix="/api/search")
+
+AUTOCOMPLETE_LIMIT = 8
+AUTOCOMPLETE_MAX_LIMIT = 20
+
+
+def _media_arg():
+    media = request.args.get("media")
+    if media is not None and media not in MEDIA_TYPES:
+        return None, (jsonify({"error": f"media must be one of: {', '.join(MEDIA_TYPES)}"}), 400)
+    return ((media,) if media else MEDIA_TYPES), None
+
+
+@bp.route("/semantic", methods=["GET"])
+def search_semantic():
+    """
+    Free-text search over plots: /api/search/semantic?q=heist in space
+    [&media=movie|tv][&limit=20]
+    """
+    query = request.args.get("q", "").strip()
+
+    if not query:
+        return jsonify([])
+
+    media_types, error = _media_arg()
+    if error:
+        return error
+
+    limit = request.args.get("limit", SEMANTIC_SEARCH_LIMIT, type=int)
+    limit = max(1, min(limit, SEMANTIC_SEARCH_MAX_LIMIT))
+
+    return jsonify(semantic_search(query, media_types, limit))
+
+
+@bp.route("/autocomplete", methods=["GET"])
+def search_autocomplete():
+    """
+    Title completions as the user types: /api/search/autocomplete?q=star wa
+    [&media=movie|tv][&limit=8]. Any word of a title can match the prefix;
+    most popular first, each with "media_type"
+    """
+    query = request.args.get("q", "").strip()
+
+    if not query:
+        return jsonify([])
+
+    media_types, error = _media_arg()
+    if error:
+        return error
+
+    limit = request.args.get("limit", AUTOCOMPLETE_LIMIT, type=int)
+    limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+
+    return jsonify(title_index.suggest(query, media_types, limit))
@@ -1,34 +1,98 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, request
 from app.auth.auth_utils import get_current_user_id
-from app.services.recommendation_service import (
-    generate_user_movie_recommendations,
-    generate_user_tv_recommendations,
-)
+from app.services.recommendation_service import serve_user_recommendations, ENGINES
+from app.services.recommendation_cache import recommendation_cache
+from app.services.serving_metrics import serving_metrics
+import traceback
+import hmac
+import time
+import os
 
 bp = Blueprint("user_recommendations", __name__, url_prefix="/api")
 
 
-@bp.route("/user_recommendations/movies", methods=["GET"])
-def get_movie_recommendations():
+def _serve(endpoint: str, media_types, shape):
+    """
+    Shared body of the recommendation routes: auth, ?engine=, the tier
+    header and the latency metrics
+    """
+    started = time.perf_counter()
 
     user_id = get_current_user_id()
 
     if not user_id:
         return jsonify({"error": "Unauthorized"}), 401
 
-    movies = generate_user_movie_recommendations(user_id)
+    engine = request.args.get("engine")
+    if engine is not None and engine not in ENGINES:
+        return jsonify({"error": f"engine must be one of: {', '.join(ENGINES)}"}), 400
+
+    try:
+        rows, tier = serve_user_recommendations(user_id, media_types, engine=engine)
+    except Exception:
+        traceback.print_exc()
+        rows, tier = {media_type: [] for media_type in media_types}, "error"
+
+    response = jsonify(shape(rows))
+    response.headers["X-Recommendation-Tier"] = tier
+
+    serving_metrics.observe(endpoint, tier, time.perf_counter() - started)
+
+    return response
+
+
+@bp.route("/user_recommendations", methods=["GET"])
+def get_recommendations():
+
+    return _serve(
+        "all",
+        ("movie", "tv"),
+        lambda rows: {"movies": rows["movie"], "tv": rows["tv"]}
+    )
+
+
+@bp.route("/user_recommendations/movies", methods=["GET"])
+def get_movie_recommendations():
 
-    return jsonify(movies)
+    return _serve("movies", ("movie",), lambda rows: rows["movie"])
 
 
 @bp.route("/user_recommendations/tv", methods=["GET"])
 def get_tv_recommendations():
 
-    user_id = get_current_user_id()
+    return _serve("tv", ("tv",), lambda rows: rows["tv"])
 
-    if not user_id:
+
+# --- OPERATIONAL ENDPOINTS ---
+# a logged-in user, or a scraper sending "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def _operator_allowed() -> bool:
+    if get_current_user_id():
+        return True
+
+    header = request.headers.get("Authorization", "")
+    return bool(METRICS_TOKEN) and hmac.compare_digest(header, f"Bearer {METRICS_TOKEN}")
+
+
+@bp.route("/user_recommendations/cache_stats", methods=["GET"])
+def get_cache_stats():
+    """
+    Hit rate, size and invalidations of this worker's recommendation cache
+    """
+    if not _operator_allowed():
         return jsonify({"error": "Unauthorized"}), 401
 
-    shows = generate_user_tv_recommendations(user_id)
+    return jsonify(recommendation_cache.stats())
+
+
+@bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Serving tiers and latency histograms in the Prometheus text format
+    """
+    if not _operator_allowed():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    return jsonify(shows)
\ No newline at end of file
+    return Response(serving_metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,124 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# run as `python scripts/benchmark_similar_users.py` from backend/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.user_item_matrix import UserItemMatrix
+from app.services.minhash_index import MinHashLSH
+
+# ------------------------
+# Compares MinHash/LSH similar-user retrieval against the exact
+# weighted-Jaccard scan on a synthetic catalog with taste clusters.
+# Reports precision/recall of the retrieved users, overlap of the final
+# top recommendations and per-request latency of both paths.
+# ------------------------
+
+
+def synthetic_rows(n_users, n_items, n_clusters, rng):
+    cluster_of = rng.integers(0, n_clusters, size=n_items)
+    by_cluster = [np.flatnonzero(cluster_of == c) for c in range(n_clusters)]
+
+    # Zipf-ish popularity so a few titles show up in many lists
+    popularity = 1.0 / np.arange(1, n_items + 1) ** 0.8
+    popularity = popularity[rng.permutation(n_items)]
+
+    rows = {}
+
+    for u in range(n_users):
+        size = int(rng.integers(3, 40))
+        home = by_cluster[int(rng.integers(0, n_clusters))]
+
+        n_home = int(size * 0.8)
+        p_home = popularity[home] / popularity[home].sum()
+        picked = set(rng.choice(home, size=min(n_home, len(home)), replace=False, p=p_home))
+        picked |= set(rng.choice(n_items, size=size - n_home, replace=False, p=popularity / popularity.sum()))
+
+        rows[f"u{u}"] = {int(i): float(rng.choice([1, 2, 3])) for i in picked}
+
+    return rows
+
+
+def lsh_scores(user_key, items, weights, matrix, lsh, top_n):
+    neighbors = lsh.query(items, top_n, exclude=user_key)
+    scores = matrix.collaborative_scores(user_key, items, weights, candidates=neighbors)
+
+    return neighbors, scores
+
+
+def top_ids(scores, k):
+    return set(sorted(scores, key=scores.get, reverse=True)[:k])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MinHash/LSH vs exact similar-user benchmark")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--clusters", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=200)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print(f"Generating {args.users} users over {args.items} items...")
+    rows = synthetic_rows(args.users, args.items, args.clusters, rng)
+
+    started = time.perf_counter()
+    matrix = UserItemMatrix.from_rows("movie", rows)
+    matrix_build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lsh = MinHashLSH(num_perm=args.num_perm, bands=args.bands)
+    lsh.bulk_load({key: items.keys() for key, items in rows.items()})
+    lsh_build = time.perf_counter() - started
+
+    queries = rng.choice(list(rows), size=args.queries, replace=False)
+
+    precision, recall, rec_overlap = [], [], []
+    exact_ms, lsh_ms = [], []
+
+    for key in queries:
+        items = list(rows[key])
+        weights = rows[key]
+
+        started = time.perf_counter()
+        exact_collab = matrix.collaborative_scores(key, items, weights)
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        neighbors, approx_collab = lsh_scores(key, items, weights, matrix, lsh, args.top_n)
+        lsh_ms.append((time.perf_counter() - started) * 1000)
+
+        exact_users = {u for u, _ in matrix.similar_users(key, items, weights, args.top_n)}
+
+        if neighbors:
+            precision.append(len(exact_users & set(neighbors)) / len(neighbors))
+        if exact_users:
+            recall.append(len(exact_users & set(neighbors)) / len(exact_users))
+
+        exact_top = top_ids(exact_collab, 12)
+        if exact_top:
+            rec_overlap.append(len(exact_top & top_ids(approx_collab, 12)) / len(exact_top))
+
+    def pct(values, q):
+        return float(np.percentile(values, q)) if values else 0.0
+
+    print()
+    print(f"Build:            matrix {matrix_build:.2f}s   lsh {lsh_build:.2f}s")
+    print(f"Users precision@{args.top_n}: {np.mean(precision):.3f}")
+    print(f"Users recall@{args.top_n}:    {np.mean(recall):.3f}")
+    print(f"Top-12 overlap:   {np.mean(rec_overlap):.3f}")
+    print(f"Exact latency:    p50 {pct(exact_ms, 50):.2f}ms   p99 {pct(exact_ms, 99):.2f}ms")
+    print(f"LSH latency:      p50 {pct(lsh_ms, 50):.2f}ms   p99 {pct(lsh_ms, 99):.2f}ms")
+    print(f"Speedup (p50):    {pct(exact_ms, 50) / max(pct(lsh_ms, 50), 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import sys
+
+from build_recommender import main
+
+# kept for existing jobs: same as `python scripts/build_recommender.py collab`
+if __name__ == "__main__":
+    main(["collab", *sys.argv[1:]])
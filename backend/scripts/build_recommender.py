@@ -0,0 +1,386 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# run as `python scripts/build_recommender.py <command>` from backend/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.content_artifacts import ARTIFACTS_PATH, content_document
+from app.services.generation import bump_catalog_generation
+from als_build import ALPHA, FACTORS, ITERATIONS, REGULARIZATION, publish_als, train_als
+from collab_build import build_neighbors, load_user_items, publish_collab
+from content_build import REFIT_DRIFT, build_content
+from similarity_topk import DEFAULT_CHUNK_SIZE, StepTimer, peak_rss_mb
+
+# ------------------------
+# Single entry point for the offline recommender builds:
+#
+#   python scripts/build_recommender.py content [--media movie tv] [--top-k 20] ...
+#   python scripts/build_recommender.py collab  [--media movie tv] ...
+#   python scripts/build_recommender.py als     [--factors 64] ...
+#   python scripts/build_recommender.py all
+#
+# Content builds of different media types run side by side in their own
+# processes; every run writes <output-dir>/build_manifest.json with the
+# settings, per-step timings and peak memory.
+# ------------------------
+
+MEDIA_TYPES = ("movie", "tv")
+
+# media type -> (collection, title field)
+SOURCES = {
+    "movie": ("movies", "title"),
+    "tv": ("tv_shows", "name"),
+}
+
+TOP_K = 20
+NGRAM_RANGE = (1, 2)
+MIN_DF = 3
+MAX_DF = 0.8
+
+# documents per Mongo round trip while streaming the catalog
+BATCH_SIZE = 2000
+
+BUILD_MANIFEST = "build_manifest.json"
+
+
+# ------------------------
+# HELPERS
+# ------------------------
+def _connect():
+    load_dotenv()
+    return MongoClient(os.getenv("MONGO_URI"))["movie_platform"]
+
+
+def iter_documents(collection, title_field: str, batch_size: int = BATCH_SIZE) -> Iterator[Tuple[int, str]]:
+    """
+    Stream (tmdb_id, document text) pairs, fetching only the fields the
+    TF-IDF document is made of
+    """
+    cursor = collection.find(
+        {},
+        {
+            "_id": 0,
+            "tmdb_id": 1,
+            title_field: 1,
+            "overview": 1,
+            "genres": 1,
+        },
+        batch_size=batch_size,
+    )
+
+    for doc in cursor:
+        yield int(doc["tmdb_id"]), content_document(doc, title_field)
+
+
+def _rounded(timings: Dict[str, float]) -> Dict[str, float]:
+    return {name: round(seconds, 3) for name, seconds in timings.items()}
+
+
+def _memory() -> Dict[str, Optional[float]]:
+    own, children = peak_rss_mb()
+    return {"main": own, "largest_child": children}
+
+
+# ------------------------
+# CONTENT (TF-IDF + TOP-K NEIGHBORS)
+# ------------------------
+def build_content_media(media_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Load and build one media type. Runs in its own process when several
+    media types are built at once.
+    """
+    timer = StepTimer()
+    db = _connect()
+
+    collection_name, title_field = SOURCES[media_type]
+
+    tmdb_ids: List[int] = []
+    documents: List[str] = []
+
+    for tmdb_id, text in iter_documents(db[collection_name], title_field, options["batch_size"]):
+        tmdb_ids.append(tmdb_id)
+        documents.append(text)
+
+    if not tmdb_ids:
+        raise RuntimeError(f"No {media_type} documents found in {collection_name}")
+
+    timer.step("load")
+
+    print(f"{media_type}: {len(tmdb_ids)} documents, computing top-{options['top_k']} neighbors...")
+
+    info = build_content(
+        media_type,
+        tmdb_ids,
+        documents,
+        options["top_k"],
+        options["vectorizer_params"],
+        workers=options["workers"],
+        chunk_size=options["chunk_size"],
+        full=options["full"],
+        refit_drift=options["refit_drift"],
+        timer=timer,
+        root=options["output_dir"],
+        embedding_dims=options["embedding_dims"],
+    )
+
+    timer.report(media_type)
+
+    return {
+        "media_type": media_type,
+        "status": "unchanged" if info is None else "published",
+        "version": info["version"] if info else None,
+        "mode": info["mode"] if info else None,
+        "items": len(tmdb_ids),
+        "embedding": info.get("embedding") if info else None,
+        "timings": _rounded(timer.timings),
+        "peak_rss_mb": _memory(),
+    }
+
+
+def run_content(args) -> List[Dict[str, Any]]:
+    media_types = args.media
+    total_workers = args.workers or os.cpu_count() or 1
+
+    options = {
+        "top_k": args.top_k,
+        "vectorizer_params": {
+            "ngram_range": tuple(args.ngram),
+            "min_df": args.min_df,
+            "max_df": args.max_df,
+        },
+        # similarity processes are split between the media types built at once
+        "workers": max(1, total_workers // len(media_types)),
+        "chunk_size": args.chunk_size,
+        "full": args.full,
+        "refit_drift": args.refit_drift,
+        "embedding_dims": args.embedding_dims,
+        "batch_size": args.batch_size,
+        "output_dir": args.output_dir,
+    }
+
+    if len(media_types) == 1:
+        return [_guarded(media_types[0], build_content_media, media_types[0], options)]
+
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=len(media_types), mp_context=context) as pool:
+        futures = {
+            media_type: pool.submit(build_content_media, media_type, options)
+            for media_type in media_types
+        }
+        return [_guarded(media_type, futures[media_type].result) for media_type in media_types]
+
+
+def _guarded(media_type: str, fn, *args) -> Dict[str, Any]:
+    # one media type failing must not hide what the other one published
+    try:
+        return fn(*args)
+    except Exception as e:
+        traceback.print_exc()
+        return {"media_type": media_type, "status": "failed", "error": str(e)}
+
+
+# ------------------------
+# COLLABORATIVE (ITEM-ITEM CO-OCCURRENCE)
+# ------------------------
+def run_collab(args, user_items) -> List[Dict[str, Any]]:
+    timer = StepTimer()
+    results = []
+
+    for media_type in args.media:
+        neighbors = build_neighbors(user_items, media_type, args.top_k)
+        version = publish_collab(media_type, neighbors, args.output_dir, top_k=args.top_k)
+        timer.step(media_type)
+
+        results.append({
+            "media_type": media_type,
+            "status": "published",
+            "version": version,
+            "items": len(neighbors),
+            "seconds": round(timer.timings[media_type], 3),
+        })
+
+    timer.report("Collab")
+
+    return results
+
+
+# ------------------------
+# MATRIX FACTORIZATION (IMPLICIT ALS)
+# ------------------------
+def run_als(args, user_items, signals_at: datetime) -> List[Dict[str, Any]]:
+    timer = StepTimer()
+    results = []
+
+    for media_type in args.media:
+        model = train_als(
+            user_items,
+            media_type,
+            factors=args.factors,
+            regularization=args.regularization,
+            alpha=args.alpha,
+            iterations=args.iterations,
+        )
+
+        if model is None:
+            timer.step(media_type)
+            results.append({"media_type": media_type, "status": "skipped", "reason": "no interactions"})
+            continue
+
+        version = publish_als(media_type, model, signals_at, args.output_dir)
+        timer.step(media_type)
+
+        results.append({
+            "media_type": media_type,
+            "status": "published",
+            "version": version,
+            **model["info"],
+            "seconds": round(timer.timings[media_type], 3),
+        })
+
+    timer.report("ALS")
+
+    return results
+
+
+# ------------------------
+# CLI
+# ------------------------
+def _parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--media", nargs="+", choices=MEDIA_TYPES, default=list(MEDIA_TYPES), help="media types to build (default: both)")
+    common.add_argument("--top-k", type=int, default=TOP_K, help="neighbors kept per item")
+    common.add_argument("--output-dir", default=ARTIFACTS_PATH, help="artifact root the manifest and versions are written to")
+    common.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="documents per Mongo round trip")
+
+    content = argparse.ArgumentParser(add_help=False)
+    content.add_argument("--ngram", nargs=2, type=int, default=list(NGRAM_RANGE), metavar=("MIN", "MAX"), help="TF-IDF n-gram range")
+    content.add_argument("--min-df", type=int, default=MIN_DF, help="ignore terms in fewer documents than this")
+    content.add_argument("--max-df", type=float, default=MAX_DF, help="ignore terms in more than this share of documents")
+    content.add_argument("--workers", type=int, default=None, help="similarity processes in total (default: all cores)")
+    content.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per similarity block")
+    content.add_argument("--full", action="store_true", help="refit from scratch instead of an incremental update")
+    content.add_argument("--refit-drift", type=float, default=REFIT_DRIFT, help="catalog share changed since the last fit that forces a refit")
+    content.add_argument("--embedding-dims", type=int, default=0, help="also store TruncatedSVD embeddings of this many dimensions for dense serving (0: off)")
+
+    als = argparse.ArgumentParser(add_help=False)
+    als.add_argument("--factors", type=int, default=FACTORS, help="latent factors per user/item")
+    als.add_argument("--regularization", type=float, default=REGULARIZATION, help="L2 penalty of the least-squares solves")
+    als.add_argument("--alpha", type=float, default=ALPHA, help="confidence per unit of interaction weight")
+    als.add_argument("--iterations", type=int, default=ITERATIONS, help="ALS sweeps")
+
+    parser = argparse.ArgumentParser(description="Build the recommender artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("content", parents=[common, content], help="TF-IDF content neighbors")
+    commands.add_parser("collab", parents=[common], help="item-item collaborative neighbors")
+    commands.add_parser("als", parents=[common, als], help="implicit ALS user/item factors")
+    commands.add_parser("all", parents=[common, content, als], help="content, then collab and ALS")
+
+    return parser
+
+
+def write_build_manifest(output_dir: str, record: Dict[str, Any]):
+    path = os.path.join(output_dir, BUILD_MANIFEST)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(record, f, indent=2)
+
+    os.replace(tmp_path, path)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    args = _parser().parse_args(argv)
+    args.output_dir = os.path.abspath(args.output_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    started_at = datetime.utcnow().isoformat()
+    started = time.perf_counter()
+
+    record = {
+        "command": args.command,
+        "started_at": started_at,
+        "settings": {
+            "media": args.media,
+            "top_k": args.top_k,
+            "batch_size": args.batch_size,
+        },
+    }
+
+    if args.command in ("content", "all"):
+        record["settings"].update({
+            "ngram_range": args.ngram,
+            "min_df": args.min_df,
+            "max_df": args.max_df,
+            "workers": args.workers,
+            "chunk_size": args.chunk_size,
+            "full": args.full,
+            "refit_drift": args.refit_drift,
+            "embedding_dims": args.embedding_dims,
+        })
+        record["content"] = run_content(args)
+
+    if args.command in ("als", "all"):
+        record["settings"].update({
+            "factors": args.factors,
+            "regularization": args.regularization,
+            "alpha": args.alpha,
+            "iterations": args.iterations,
+        })
+
+    if args.command in ("collab", "als", "all"):
+        # collab and ALS learn from the same signals; read them once
+        print("Loading user lists and interactions...")
+        signals_at = datetime.utcnow()
+        load_started = time.perf_counter()
+        user_items = load_user_items(_connect(), args.batch_size)
+        record["signals_load_seconds"] = round(time.perf_counter() - load_started, 3)
+
+        stages = {
+            "collab": lambda: run_collab(args, user_items),
+            "als": lambda: run_als(args, user_items, signals_at),
+        }
+        for stage, run in stages.items():
+            if args.command not in (stage, "all"):
+                continue
+            try:
+                record[stage] = run()
+            except Exception as e:
+                traceback.print_exc()
+                record[stage] = [{"status": "failed", "error": str(e)}]
+
+    results = record.get("content", []) + record.get("collab", []) + record.get("als", [])
+
+    # ------------------------
+    # INVALIDATE CACHED RECOMMENDATIONS
+    # ------------------------
+    if any(r["status"] == "published" for r in results):
+        bump_catalog_generation()
+
+    record["finished_at"] = datetime.utcnow().isoformat()
+    record["wall_seconds"] = round(time.perf_counter() - started, 3)
+    record["peak_rss_mb"] = _memory()
+
+    write_build_manifest(args.output_dir, record)
+
+    print(f"Build finished in {record['wall_seconds']:.2f}s, manifest: {os.path.join(args.output_dir, BUILD_MANIFEST)}")
+
+    if any(r["status"] == "failed" for r in results):
+        sys.exit(1)
+
+    return record
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import os
+import pickle
+from typing import Any, Dict, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+from app.services.artifact_registry import new_version, publish_version
+from app.services.content_artifacts import ARTIFACTS_PATH, MODELS_PATH
+
+# ------------------------
+# Item-item co-occurrence neighbors from My List entries and
+# seen/like/love interactions, one "collab" component per media type.
+# ------------------------
+
+INTERACTION_WEIGHTS = {
+    "seen": 1,
+    "like": 2,
+    "love": 3
+}
+
+TOP_K = 20
+
+# co-occurrence is divided by (pop_i * pop_j) ** POPULARITY_ALPHA;
+# 0.5 is plain cosine similarity, higher values push niche titles up
+POPULARITY_ALPHA = 0.5
+
+# ignore pairs seen together by fewer users than this
+MIN_SUPPORT = 2
+
+
+# ------------------------
+# LOAD USER SIGNALS
+# ------------------------
+def load_user_items(db, batch_size: int = 5000) -> Dict[Tuple[Any, str], Dict[int, float]]:
+    """
+    (user_id, media_type) -> {tmdb_id: weight}
+    """
+    user_items = {}
+
+    for u in db["users"].find({}, {"my_list": 1}, batch_size=batch_size):
+        for item in u.get("my_list", []) or []:
+            if isinstance(item, dict) and item.get("media_type") in ("movie", "tv"):
+                user_items.setdefault((u["_id"], item["media_type"]), {})[item["tmdb_id"]] = 1
+
+    for i in db["user_interactions"].find(
+        {},
+        {"_id": 0, "user_id": 1, "tmdb_id": 1, "media_type": 1, "interaction": 1},
+        batch_size=batch_size,
+    ):
+        user_items.setdefault((i["user_id"], i["media_type"]), {})[i["tmdb_id"]] = (
+            INTERACTION_WEIGHTS.get(i["interaction"], 1)
+        )
+
+    return user_items
+
+
+# ------------------------
+# BUILD
+# ------------------------
+def build_neighbors(user_items: Dict[Tuple[Any, str], Dict[int, float]], media_type: str, top_k: int = TOP_K):
+    """
+    {tmdb_id: [(neighbor tmdb_id, score), ...]} for one media type,
+    best first
+    """
+    item_cols = {}
+    item_ids = []
+    rows, cols, data = [], [], []
+
+    n_users = 0
+
+    for (_, mt), items in user_items.items():
+        if mt != media_type or not items:
+            continue
+
+        for tmdb_id, weight in items.items():
+            col = item_cols.get(tmdb_id)
+            if col is None:
+                col = len(item_ids)
+                item_cols[tmdb_id] = col
+                item_ids.append(tmdb_id)
+
+            rows.append(n_users)
+            cols.append(col)
+            data.append(float(weight))
+
+        n_users += 1
+
+    if not item_ids:
+        return {}
+
+    weights = sp.csr_matrix(
+        (data, (rows, cols)),
+        shape=(n_users, len(item_ids)),
+        dtype=np.float64,
+    )
+
+    binary = weights.copy()
+    binary.data[:] = 1.0
+
+    # weighted co-occurrence and how many users support each pair
+    cooc = (weights.T @ weights).tocsr()
+    support = (binary.T @ binary).tocsr()
+
+    # popularity damping (squared-weight mass per item, the co-occurrence diagonal)
+    popularity = cooc.diagonal()
+    damping = np.power(np.maximum(popularity, 1e-12), -POPULARITY_ALPHA)
+
+    cooc = sp.diags(damping) @ cooc @ sp.diags(damping)
+    cooc = cooc.multiply(support >= MIN_SUPPORT).tocsr()
+    cooc.setdiag(0)
+    cooc.eliminate_zeros()
+
+    neighbors = {}
+
+    for row in range(cooc.shape[0]):
+        start, end = cooc.indptr[row], cooc.indptr[row + 1]
+        if start == end:
+            continue
+
+        scores = cooc.data[start:end]
+        idx = cooc.indices[start:end]
+
+        if len(scores) > top_k:
+            top = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top = np.arange(len(scores))
+
+        top = top[np.argsort(-scores[top])]
+
+        neighbors[item_ids[row]] = [
+            (item_ids[idx[j]], float(scores[j])) for j in top
+        ]
+
+    print(f"{media_type}: {n_users} users, {len(item_ids)} items, {len(neighbors)} with neighbors")
+
+    return neighbors
+
+
+# ------------------------
+# OUTPUT
+# ------------------------
+def publish_collab(media_type: str, neighbors: Dict[int, list], root: str = ARTIFACTS_PATH, **info) -> str:
+    # versioned copy, hot-reloaded by the server
+    version, version_path = new_version(media_type, "collab", root)
+
+    with open(os.path.join(version_path, "collab.pkl"), "wb") as f:
+        pickle.dump(neighbors, f)
+
+    publish_version(media_type, "collab", version, version_path, root=root, items=len(neighbors), **info)
+
+    # pre-registry layout, only for the default location
+    if root == ARTIFACTS_PATH:
+        os.makedirs(MODELS_PATH, exist_ok=True)
+        with open(os.path.join(MODELS_PATH, f"{media_type}_collab.pkl"), "wb") as f:
+            pickle.dump(neighbors, f)
+
+    return version
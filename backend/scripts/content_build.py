@@ -0,0 +1,461 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from typing import Any, Dict, List, Optional
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from app.services.artifact_registry import new_version, publish_version, read_manifest
+from app.services.content_artifacts import (
+    ARTIFACTS_PATH,
+    ARTIFACT_NAMES,
+    MODELS_PATH,
+    load_index_to_tmdb,
+    load_neighbors,
+    load_tfidf_matrix,
+)
+from similarity_topk import DEFAULT_CHUNK_SIZE, topk_neighbors
+
+# ------------------------
+# Shared TF-IDF + top-K neighbor build for movies and TV.
+#
+# Every document gets a content hash. A rerun diffs the catalog against
+# the last published version and, unless the drift since the vectorizer
+# was fit is too large, only:
+#   - transforms new/changed documents with the saved vectorizer
+#   - recomputes neighbors of those rows, of rows that listed a changed
+#     or deleted item, and of rows a new vector may now enter
+#   - drops deleted ids
+# ------------------------
+
+# Refit the vectorizer once this share of the catalog was added, changed
+# or removed since the last full fit (IDF weights and the vocabulary go
+# stale as the catalog moves away from the documents they were fit on)
+REFIT_DRIFT = 0.1
+
+# rows compared against the sparse neighbors in the embedding report,
+# and single-item queries timed per representation
+EMBEDDING_SAMPLE = 1000
+LATENCY_QUERIES = 200
+
+
+def document_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# ------------------------
+# PREVIOUS VERSION
+# ------------------------
+def _load_previous(media_type: str, root: str) -> Optional[Dict[str, Any]]:
+    entry = read_manifest(root).get(media_type, {}).get("content")
+    if not entry:
+        return None
+
+    directory = os.path.join(root, entry["path"])
+    names = ARTIFACT_NAMES[media_type]
+
+    hashes_path = os.path.join(directory, f"{names['hashes']}.npy")
+    if not os.path.exists(hashes_path):
+        # published before content hashes existed
+        return None
+
+    neighbors = load_neighbors(media_type, directory)
+    if neighbors is None:
+        return None
+
+    svd_path = os.path.join(directory, f"{names['svd']}.joblib")
+
+    return {
+        "entry": entry,
+        "matrix": load_tfidf_matrix(media_type, directory),
+        "ids": np.asarray(load_index_to_tmdb(media_type, directory)),
+        "hashes": np.load(hashes_path),
+        "neighbor_ids": np.asarray(neighbors[0]),
+        "neighbor_scores": np.asarray(neighbors[1]),
+        "vectorizer": joblib.load(os.path.join(directory, f"{names['vectorizer']}.joblib")),
+        "svd": joblib.load(svd_path) if os.path.exists(svd_path) else None,
+    }
+
+
+# ------------------------
+# BUILD
+# ------------------------
+def build_content(
+    media_type: str,
+    tmdb_ids: List[int],
+    documents: List[str],
+    top_k: int,
+    vectorizer_params: Dict[str, Any],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    full: bool = False,
+    refit_drift: float = REFIT_DRIFT,
+    timer=None,
+    root: str = ARTIFACTS_PATH,
+    embedding_dims: int = 0,
+) -> Optional[Dict[str, Any]]:
+    """
+    Build and publish the content artifacts of one media type under `root`.
+    With `embedding_dims`, also store L2-normalized TruncatedSVD embeddings
+    for dense serving.
+
+    Returns the published manifest info plus the version, or None when
+    nothing changed.
+    """
+    ids = np.asarray(tmdb_ids, dtype=np.int64)
+    hashes = np.fromiter((document_hash(d) for d in documents), dtype=np.uint64, count=len(documents))
+
+    # manifest entries are JSON, so compare against the JSON form
+    params = json.loads(json.dumps(vectorizer_params))
+
+    previous = None if full else _load_previous(media_type, root)
+    if previous is not None and previous["entry"].get("vectorizer_params", params) != params:
+        print(f"{media_type}: vectorizer settings changed, refitting")
+        previous = None
+
+    stats = {"added": len(ids), "changed": 0, "deleted": 0}
+    plan = None
+
+    if previous is not None:
+        plan = _incremental_plan(previous, ids, hashes)
+        stats = plan["stats"]
+
+        touched = stats["added"] + stats["changed"] + stats["deleted"]
+        if touched == 0 and previous["entry"].get("embedding_dims", 0) == embedding_dims:
+            print(f"{media_type}: no catalog changes since {previous['entry']['version']}")
+            return None
+
+        entry = previous["entry"]
+        drift = (entry.get("changed_since_fit", 0) + touched) / max(entry.get("fit_items", len(ids)), 1)
+
+        if drift > refit_drift:
+            print(f"{media_type}: drift {drift:.1%} since last fit, refitting")
+            plan = None
+        else:
+            plan["changed_since_fit"] = entry.get("changed_since_fit", 0) + touched
+
+    if plan is None:
+        result = _full_build(ids, hashes, documents, top_k, vectorizer_params, workers, chunk_size)
+    else:
+        result = _incremental_build(previous, plan, documents, top_k, workers, chunk_size)
+
+    if timer is not None:
+        timer.step("build")
+
+    embedding_report = None
+    if embedding_dims:
+        embedding_report = _build_embeddings(result, previous if plan is not None else None, embedding_dims, top_k)
+        if timer is not None:
+            timer.step("embed")
+
+    info = {
+        "items": len(result["ids"]),
+        "mode": result["mode"],
+        "recomputed": result["recomputed"],
+        "fit_items": result["fit_items"],
+        "changed_since_fit": result["changed_since_fit"],
+        "top_k": top_k,
+        "vectorizer_params": params,
+        "embedding_dims": embedding_dims,
+        **stats,
+    }
+
+    if embedding_report is not None:
+        info["embedding"] = embedding_report
+
+    if timer is not None:
+        info["timings"] = {name: round(seconds, 3) for name, seconds in timer.timings.items()}
+
+    version = _publish(media_type, result, info, root)
+
+    # the pre-registry layout only matters for the default location
+    if root == ARTIFACTS_PATH:
+        _save_legacy(media_type, result)
+
+    if timer is not None:
+        timer.step("publish")
+
+    print(
+        f"{media_type}: {info['mode']} build {version}, "
+        f"+{stats['added']} ~{stats['changed']} -{stats['deleted']}, "
+        f"{info['recomputed']}/{info['items']} neighbor rows recomputed"
+    )
+
+    return {**info, "version": version}
+
+
+def _full_build(ids, hashes, documents, top_k, vectorizer_params, workers, chunk_size):
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    matrix = vectorizer.fit_transform(documents).tocsr()
+
+    neighbor_rows, neighbor_scores = topk_neighbors(matrix, top_k, workers=workers, chunk_size=chunk_size)
+
+    return {
+        "mode": "full",
+        "vectorizer": vectorizer,
+        "matrix": matrix,
+        "ids": ids,
+        "hashes": hashes,
+        "neighbor_ids": _rows_to_ids(neighbor_rows, ids),
+        "neighbor_scores": neighbor_scores,
+        "recomputed": len(ids),
+        "fit_items": len(ids),
+        "changed_since_fit": 0,
+    }
+
+
+def _incremental_plan(previous, ids, hashes) -> Dict[str, Any]:
+    old_row = {tmdb_id: row for row, tmdb_id in enumerate(previous["ids"].tolist())}
+    old_hashes = previous["hashes"]
+
+    reused, fresh = [], []
+    changed = 0
+
+    for position, tmdb_id in enumerate(ids.tolist()):
+        row = old_row.get(tmdb_id)
+        if row is not None and old_hashes[row] == hashes[position]:
+            reused.append((position, row))
+        else:
+            fresh.append(position)
+            changed += row is not None
+
+    current = set(ids.tolist())
+    deleted = [tmdb_id for tmdb_id in old_row if tmdb_id not in current]
+
+    return {
+        "reused": reused,
+        "fresh": fresh,
+        "deleted": deleted,
+        "ids": ids,
+        "hashes": hashes,
+        "stats": {
+            "added": len(fresh) - changed,
+            "changed": changed,
+            "deleted": len(deleted),
+        },
+    }
+
+
+def _incremental_build(previous, plan, documents, top_k, workers, chunk_size):
+    vectorizer = previous["vectorizer"]
+    entry = previous["entry"]
+
+    reused_positions = [position for position, _ in plan["reused"]]
+    reused_rows = np.asarray([row for _, row in plan["reused"]], dtype=np.int64)
+    fresh = plan["fresh"]
+
+    # unchanged rows first (copied from the previous version), then fresh ones
+    blocks = [previous["matrix"][reused_rows]]
+    if fresh:
+        blocks.append(vectorizer.transform([documents[i] for i in fresh]))
+
+    matrix = sp.vstack(blocks).tocsr()
+    order = np.asarray(reused_positions + fresh, dtype=np.int64)
+    ids = plan["ids"][order]
+    hashes = plan["hashes"][order]
+
+    n_reused = len(reused_rows)
+
+    neighbor_ids = np.full((len(ids), top_k), -1, dtype=np.int32)
+    neighbor_scores = np.zeros((len(ids), top_k), dtype=np.float32)
+
+    old_k = min(top_k, previous["neighbor_ids"].shape[1])
+    neighbor_ids[:n_reused, :old_k] = previous["neighbor_ids"][reused_rows, :old_k]
+    neighbor_scores[:n_reused, :old_k] = previous["neighbor_scores"][reused_rows, :old_k]
+
+    # rows that listed an item whose vector changed or disappeared
+    stale = np.asarray(
+        [tmdb_id for tmdb_id in ids[n_reused:].tolist()] + plan["deleted"],
+        dtype=np.int64,
+    )
+    affected = set(np.flatnonzero(np.isin(neighbor_ids[:n_reused], stale).any(axis=1)).tolist())
+
+    # rows a fresh vector scores at least as high as their current K-th neighbor
+    if fresh:
+        fresh_block = matrix[n_reused:]
+        best_fresh = (matrix[:n_reused] @ fresh_block.T).max(axis=1).toarray().ravel()
+
+        kth = np.where(neighbor_ids[:n_reused, -1] >= 0, neighbor_scores[:n_reused, -1], -np.inf)
+        affected.update(np.flatnonzero(best_fresh >= kth).tolist())
+
+    affected.update(range(n_reused, len(ids)))
+    rows = np.asarray(sorted(affected), dtype=np.int64)
+
+    if len(rows):
+        neighbor_rows, scores = topk_neighbors(matrix, top_k, workers=workers, chunk_size=chunk_size, rows=rows)
+        neighbor_ids[rows] = _rows_to_ids(neighbor_rows, ids)
+        neighbor_scores[rows] = scores
+
+    return {
+        "mode": "incremental",
+        "vectorizer": vectorizer,
+        "matrix": matrix,
+        "ids": ids,
+        "hashes": hashes,
+        "neighbor_ids": neighbor_ids,
+        "neighbor_scores": neighbor_scores,
+        "recomputed": len(rows),
+        "fit_items": entry.get("fit_items", len(ids)),
+        "changed_since_fit": plan["changed_since_fit"],
+    }
+
+
+def _rows_to_ids(neighbor_rows: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    return np.where(neighbor_rows >= 0, ids[neighbor_rows], -1).astype(np.int32)
+
+
+# ------------------------
+# DENSE EMBEDDINGS
+# ------------------------
+def _build_embeddings(result, previous, dims: int, top_k: int) -> Dict[str, Any]:
+    """
+    Project the TF-IDF rows to `dims` SVD components. Incremental builds
+    keep the previous projection (the vocabulary did not change either).
+    Adds "svd" and "embeddings" to `result`, returns the quality report.
+    """
+    matrix = result["matrix"]
+
+    svd = previous.get("svd") if previous is not None else None
+    if svd is not None and svd.components_.shape[0] != min(dims, matrix.shape[1] - 1):
+        svd = None
+
+    fitted = svd is None
+    if fitted:
+        svd = TruncatedSVD(n_components=min(dims, matrix.shape[1] - 1), random_state=0)
+        svd.fit(matrix)
+
+    embeddings = normalize(svd.transform(matrix)).astype(np.float32)
+
+    result["svd"] = svd
+    result["embeddings"] = embeddings
+
+    report = {
+        "dims": embeddings.shape[1],
+        "fitted": fitted,
+        "explained_variance": round(float(svd.explained_variance_ratio_.sum()), 4),
+        **_embedding_report(matrix, embeddings, result["ids"], result["neighbor_ids"], top_k),
+    }
+
+    print(
+        f"embeddings: {report['dims']} dims, "
+        f"top-{top_k} overlap with sparse {report['overlap']:.1%}, "
+        f"query {report['sparse_query_ms']:.2f}ms -> {report['dense_query_ms']:.2f}ms, "
+        f"{report['sparse_bytes'] / 2**20:.1f}MB -> {report['dense_bytes'] / 2**20:.1f}MB"
+    )
+
+    return report
+
+
+def _embedding_report(matrix, embeddings, ids, neighbor_ids, top_k) -> Dict[str, Any]:
+    """
+    Neighbor overlap against the exact sparse top-K, single-item query
+    latency and serving footprint of both representations
+    """
+    rng = np.random.default_rng(0)
+    n_items = len(ids)
+
+    sample = np.sort(rng.choice(n_items, size=min(EMBEDDING_SAMPLE, n_items), replace=False))
+
+    k = min(top_k, n_items - 1)
+    overlaps = []
+
+    if k > 0:
+        block = embeddings[sample] @ embeddings.T
+        block[np.arange(len(sample)), sample] = -np.inf
+        dense_top = ids[np.argpartition(-block, k - 1, axis=1)[:, :k]]
+
+        for row, dense_ids in zip(sample, dense_top):
+            exact = neighbor_ids[row][neighbor_ids[row] >= 0]
+            if len(exact):
+                overlaps.append(len(np.intersect1d(exact, dense_ids)) / len(exact))
+
+    # what the server maps: float32 data, int32 indices/indptr
+    served = matrix.astype(np.float32).tocsr()
+    queries = sample[:LATENCY_QUERIES]
+
+    started = time.perf_counter()
+    for row in queries:
+        (served @ served[row].T).toarray()
+    sparse_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+    started = time.perf_counter()
+    for row in queries:
+        embeddings @ embeddings[row]
+    dense_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+
+    return {
+        "overlap": round(float(np.mean(overlaps)) if overlaps else 0.0, 4),
+        "sparse_query_ms": round(sparse_ms, 3),
+        "dense_query_ms": round(dense_ms, 3),
+        "sparse_bytes": int(served.nnz * 8 + (served.shape[0] + 1) * 4),
+        "dense_bytes": int(embeddings.nbytes),
+    }
+
+
+# ------------------------
+# OUTPUT
+# ------------------------
+def _publish(media_type: str, result: Dict[str, Any], info: Dict[str, Any], root: str) -> str:
+    names = ARTIFACT_NAMES[media_type]
+    matrix = result["matrix"]
+
+    version, path = new_version(media_type, "content", root)
+
+    np.save(os.path.join(path, f"{names['matrix']}_data.npy"), matrix.data.astype(np.float32))
+    np.save(os.path.join(path, f"{names['matrix']}_indices.npy"), matrix.indices.astype(np.int32))
+    np.save(os.path.join(path, f"{names['matrix']}_indptr.npy"), matrix.indptr.astype(np.int32))
+    np.save(os.path.join(path, f"{names['matrix']}_shape.npy"), np.asarray(matrix.shape, dtype=np.int64))
+    np.save(os.path.join(path, f"{names['ids']}.npy"), result["ids"].astype(np.int32))
+    np.save(os.path.join(path, f"{names['hashes']}.npy"), result["hashes"])
+    np.save(os.path.join(path, f"{names['neighbors']}_ids.npy"), result["neighbor_ids"])
+    np.save(os.path.join(path, f"{names['neighbors']}_scores.npy"), result["neighbor_scores"])
+    joblib.dump(result["vectorizer"], os.path.join(path, f"{names['vectorizer']}.joblib"))
+
+    if "embeddings" in result:
+        np.save(os.path.join(path, f"{names['embeddings']}.npy"), result["embeddings"])
+        joblib.dump(result["svd"], os.path.join(path, f"{names['svd']}.joblib"))
+
+    if result["mode"] == "full":
+        info["fit_version"] = version
+    else:
+        info["fit_version"] = read_manifest(root)[media_type]["content"].get("fit_version")
+
+    publish_version(media_type, "content", version, path, root=root, **info)
+
+    return version
+
+
+def _save_legacy(media_type: str, result: Dict[str, Any]):
+    """
+    Pre-registry file layout, still read by older deployments
+    """
+    names = ARTIFACT_NAMES[media_type]
+
+    os.makedirs(MODELS_PATH, exist_ok=True)
+
+    joblib.dump(result["vectorizer"], os.path.join(ARTIFACTS_PATH, f"{names['vectorizer']}.joblib"))
+    joblib.dump(result["matrix"], os.path.join(ARTIFACTS_PATH, f"{names['matrix']}.joblib"))
+
+    with open(os.path.join(ARTIFACTS_PATH, f"{names['ids']}.json"), "w") as f:
+        json.dump(result["ids"].tolist(), f)
+
+    neighbor_ids = result["neighbor_ids"]
+    neighbor_scores = result["neighbor_scores"]
+
+    similarity_map = {
+        tmdb_id: [
+            (int(n), float(score))
+            for n, score in zip(neighbor_ids[row], neighbor_scores[row])
+            if n >= 0
+        ]
+        for row, tmdb_id in enumerate(result["ids"].tolist())
+    }
+
+    with open(os.path.join(MODELS_PATH, names["model"]), "wb") as f:
+        pickle.dump(similarity_map, f)
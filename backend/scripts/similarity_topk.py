@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ------------------------
+# Blockwise top-K cosine neighbors for the content recommenders.
+#
+# Rows are processed in chunks: each chunk is one sparse x sparse product
+# against the whole (L2-normalized) TF-IDF matrix, densified to
+# chunk_size x n_items and reduced to its top K per row right away, so the
+# N x N similarity matrix never exists. Chunks fan out across a process
+# pool; each worker receives the matrix once through the initializer.
+# ------------------------
+
+DEFAULT_CHUNK_SIZE = 256
+
+# below this many rows spawning workers costs more than it saves
+PARALLEL_MIN_ROWS = 5000
+
+_matrix = None
+_matrix_t = None
+
+
+def _init_worker(matrix: sp.csr_matrix):
+    global _matrix, _matrix_t
+    _matrix = matrix
+    _matrix_t = matrix.T.tocsc()
+
+
+def _row_topk(similarities: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, ties broken by the lower index
+    (same order as a stable descending sort)
+    """
+    if k >= len(similarities):
+        candidates = np.arange(len(similarities))
+    else:
+        candidates = np.argpartition(-similarities, k - 1)[:k]
+
+        # argpartition picks arbitrary members of a tie at the cut-off
+        threshold = similarities[candidates].min()
+        above = np.flatnonzero(similarities > threshold)
+        tied = np.flatnonzero(similarities == threshold)[:k - len(above)]
+        candidates = np.concatenate((above, tied))
+
+    return candidates[np.lexsort((candidates, -similarities[candidates]))]
+
+
+def _topk_chunk(rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    block = (_matrix[rows] @ _matrix_t).toarray()
+
+    # exclude itself
+    block[np.arange(len(rows)), rows] = -np.inf
+
+    n_items = block.shape[1]
+    k_eff = min(k, n_items - 1)
+
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+
+    if k_eff <= 0:
+        return rows, neighbors, scores
+
+    top = np.argpartition(-block, k_eff - 1, axis=1)[:, :k_eff]
+    values = np.take_along_axis(block, top, axis=1)
+
+    # rows whose cut-off value is shared with unselected items need the
+    # exact tie-break; everything else is already the right set
+    threshold = values.min(axis=1, keepdims=True)
+    above = (block > threshold).sum(axis=1)
+    tied = (block == threshold).sum(axis=1)
+    ambiguous = np.flatnonzero(above + tied > k_eff)
+
+    for i in ambiguous:
+        top[i] = _row_topk(block[i], k_eff)
+        values[i] = block[i, top[i]]
+
+    order = np.lexsort((top, -values))
+    top = np.take_along_axis(top, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+
+    neighbors[:, :k_eff] = top
+    scores[:, :k_eff] = values
+
+    return rows, neighbors, scores
+
+
+def topk_neighbors(
+    matrix: sp.csr_matrix,
+    k: int,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rows: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k neighbors of every row of `matrix` (or only of `rows`).
+
+    Returns (neighbor row indices, scores) of shape (len(rows), k); rows
+    with fewer than k other items are padded with -1 / 0.
+    """
+    matrix = matrix.tocsr()
+    rows = np.arange(matrix.shape[0]) if rows is None else np.asarray(rows)
+
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), k), dtype=np.float32)
+
+    position = {row: i for i, row in enumerate(rows.tolist())}
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+
+    def collect(result):
+        chunk_rows, chunk_neighbors, chunk_scores = result
+        at = [position[row] for row in chunk_rows.tolist()]
+        neighbors[at] = chunk_neighbors
+        scores[at] = chunk_scores
+
+    if workers <= 1 or len(chunks) <= 1 or len(rows) < PARALLEL_MIN_ROWS:
+        _init_worker(matrix)
+        for chunk in chunks:
+            collect(_topk_chunk(chunk, k))
+        return neighbors, scores
+
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(matrix,),
+    ) as pool:
+        for result in pool.map(_topk_chunk, chunks, [k] * len(chunks)):
+            collect(result)
+
+    return neighbors, scores
+
+
+# ------------------------
+# BUILD STATS
+# ------------------------
+def peak_rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    """
+    Peak resident memory of this process and of its largest finished
+    child (the pool workers), in MB
+    """
+    if resource is None:
+        return None, None
+
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+
+    return own, children
+
+
+class StepTimer:
+    """
+    Collects wall-clock timings of named build steps
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._started = time.perf_counter()
+
+    def step(self, name: str):
+        now = time.perf_counter()
+        self.timings[name] = now - self._started
+        self._started = now
+
+    def report(self, label: str):
+        total = sum(self.timings.values())
+        steps = "  ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings.items())
+        own, children = peak_rss_mb()
+
+        print(f"{label} build: {total:.2f}s  ({steps})")
+        if own is not None:
+            print(f"{label} peak RSS: main {own:.0f}MB, largest worker {children:.0f}MB")
@@ -3,6 +3,7 @@ import time
 import requests
 from dotenv import load_dotenv
 from app.db import movies_collection, db
+from app.services.generation import bump_catalog_generation
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -214,6 +215,7 @@ def seed_movies():
         temp_collection.insert_many(list(movies_map.values()), ordered=False)
 
     temp_collection.rename("movies", dropTarget=True)
+    bump_catalog_generation()
     print(f"✓ Seed completed: {len(movies_map)} movies inserted")
 
 if __name__ == "__main__":
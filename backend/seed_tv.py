@@ -2,6 +2,7 @@ import os
 import requests
 from dotenv import load_dotenv
 from app.db import tv_collection, db
+from app.services.generation import bump_catalog_generation
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -209,6 +210,7 @@ def seed_tv():
         temp_collection.insert_many(list(tv_map.values()), ordered=False)
 
     temp_collection.rename("tv", dropTarget=True)
+    bump_catalog_generation()
     print(f"✓ Seed completed: {len(tv_map)} TV shows inserted")
 
 if __name__ == "__main__":
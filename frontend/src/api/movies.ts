@@ -19,6 +19,26 @@ export async function fetchMovies(
   return res.json();
 }
 
+// Keyset pages: pass "" for the first page, then each response's next_cursor
+export async function fetchMoviesAfter(
+  cursor: string,
+  limit = 20,
+  sort = "rating",
+  genre?: string,
+): Promise<{ results: Movie[]; total: number; next_cursor: string | null }> {
+  const params = new URLSearchParams({
+    cursor,
+    limit: String(limit),
+    sort,
+  });
+
+  if (genre) params.append("genre", genre);
+
+  const res = await fetch(`/api/movies?${params.toString()}`);
+  if (!res.ok) throw new Error("Failed to fetch movies");
+  return res.json();
+}
+
 export async function fetchGenres(): Promise<string[]> {
   const res = await fetch("/api/genres");
   if (!res.ok) throw new Error("Failed to fetch genres");
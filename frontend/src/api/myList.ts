@@ -1,5 +1,6 @@
 import type { Movie } from "../types/Movie";
 import type { TVShow } from "../types/TVShow";
+import { invalidateUserRecommendations } from "./user_recommendations";
 
 export type MyListItem = Movie | TVShow;
 
@@ -30,6 +31,8 @@ export async function addToMyList(tmdb_id: number, mediaType: "movie" | "tv") {
   });
 
   if (!res.ok) throw new Error("Add failed");
+
+  invalidateUserRecommendations();
 }
 
 export async function removeFromMyList(
@@ -46,4 +49,6 @@ export async function removeFromMyList(
   );
 
   if (!res.ok) throw new Error("Remove failed");
+
+  invalidateUserRecommendations();
 }
@@ -23,6 +23,29 @@ export async function fetchTV(
   return res.json();
 }
 
+export async function fetchTVAfter(
+  cursor: string,
+  limit = 20,
+  sort = "rating",
+  genre?: string,
+): Promise<{ results: Movie[]; total: number; next_cursor: string | null }> {
+  const params = new URLSearchParams({
+    cursor,
+
+    limit: String(limit),
+
+    sort,
+  });
+
+  if (genre) params.append("genre", genre);
+
+  const res = await fetch(`/api/tv?${params.toString()}`);
+
+  if (!res.ok) throw new Error("Failed to fetch tv");
+
+  return res.json();
+}
+
 export async function fetchTVGenres(): Promise<string[]> {
   const res = await fetch("/api/tv/genres");
 
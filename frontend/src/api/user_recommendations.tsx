@@ -1,19 +1,56 @@
-export async function fetchMovieRecommendations() {
-  const res = await fetch("/api/user_recommendations/movies", {
-    credentials: "include",
-  });
+import type { Movie } from "../types/Movie";
+import type { TVShow } from "../types/TVShow";
+
+type UserRecommendations = {
+  movies: Movie[];
+  tv: TVShow[];
+};
+
+// Both rows come from one /api/user_recommendations call; the result is
+// shared between the Movies and TV pages for a short while.
+const SHARED_TTL_MS = 60_000;
 
-  if (!res.ok) return [];
+let shared: Promise<UserRecommendations> | null = null;
+let sharedAt = 0;
 
-  return res.json();
+export function invalidateUserRecommendations() {
+  shared = null;
 }
 
-export async function fetchTVRecommendations() {
-  const res = await fetch("/api/user_recommendations/tv", {
+export async function fetchUserRecommendations(): Promise<UserRecommendations> {
+  if (shared && Date.now() - sharedAt < SHARED_TTL_MS) return shared;
+
+  // a late response must not drop a newer request's promise
+  const forget = () => {
+    if (shared === request) shared = null;
+  };
+
+  const request: Promise<UserRecommendations> = fetch("/api/user_recommendations", {
     credentials: "include",
-  });
+  })
+    .then((res) => {
+      if (!res.ok) {
+        forget();
+        return { movies: [], tv: [] };
+      }
 
-  if (!res.ok) return [];
+      return res.json();
+    })
+    .catch((err) => {
+      forget();
+      throw err;
+    });
 
-  return res.json();
+  sharedAt = Date.now();
+  shared = request;
+
+  return request;
+}
+
+export async function fetchMovieRecommendations() {
+  return (await fetchUserRecommendations()).movies;
+}
+
+export async function fetchTVRecommendations() {
+  return (await fetchUserRecommendations()).tv;
 }
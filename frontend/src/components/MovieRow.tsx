@@ -1,7 +1,7 @@
 import { useCallback, useEffect, useRef, useState } from "react";
 import type { Movie } from "../types/Movie";
-import { fetchMovies } from "../api/movies";
-import { fetchTV } from "../api/tv";
+import { fetchMoviesAfter } from "../api/movies";
+import { fetchTVAfter } from "../api/tv";
 import MovieCard from "./MovieCard";
 import { useDragScroll } from "../hooks/useDragScroll";
 
@@ -28,18 +28,18 @@ function MovieRow({
 }: Props) {
   const [movies, setMovies] = useState<Movie[]>([]);
   const [loading, setLoading] = useState(!injectedMovies);
-  const [page, setPage] = useState(1);
+  const [cursor, setCursor] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(true);
 
   const drag = useDragScroll();
   const sentinelRef = useRef<HTMLDivElement | null>(null);
 
   const fetchPage = useCallback(
-    (p: number) => {
+    (after: string) => {
       if (mediaType === "tv") {
-        return fetchTV(p, 20, sort, genre);
+        return fetchTVAfter(after, 20, sort, genre);
       }
-      return fetchMovies(p, 20, sort, genre);
+      return fetchMoviesAfter(after, 20, sort, genre);
     },
     [mediaType, sort, genre],
   );
@@ -48,28 +48,28 @@ function MovieRow({
     if (disableFetch) return;
 
     setLoading(true);
-    setPage(1);
+    setCursor(null);
 
-    fetchPage(1).then((data) => {
+    fetchPage("").then((data) => {
       setMovies(data.results);
-      setHasMore(data.results.length === 20);
+      setCursor(data.next_cursor);
+      setHasMore(data.next_cursor !== null);
       setLoading(false);
     });
   }, [sort, genre, disableFetch, mediaType, fetchPage]);
   useEffect(() => {
-    if (!hasMore || disableFetch) return;
+    if (!hasMore || !cursor || disableFetch) return;
 
     const observer = new IntersectionObserver(
       (entries) => {
         if (entries[0].isIntersecting && !loading) {
-          const nextPage = page + 1;
-
           setLoading(true);
 
-          fetchPage(nextPage).then((data) => {
+          // keyset cursor: a deep page costs the server what the first does
+          fetchPage(cursor).then((data) => {
             setMovies((prev) => [...prev, ...data.results]);
-            setHasMore(data.results.length === 20);
-            setPage(nextPage);
+            setCursor(data.next_cursor);
+            setHasMore(data.next_cursor !== null);
             setLoading(false);
           });
         }
@@ -86,7 +86,7 @@ function MovieRow({
 
     return () => observer.disconnect();
   }, [
-    page,
+    cursor,
     hasMore,
     loading,
     sort,
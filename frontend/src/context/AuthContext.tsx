@@ -1,5 +1,6 @@
 import { createContext, useContext, useEffect, useState } from "react";
 import * as authApi from "../api/auth";
+import { invalidateUserRecommendations } from "../api/user_recommendations";
 import toast from "react-hot-toast";
 
 type User = {
@@ -100,6 +101,8 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
   async function login(email: string, password: string) {
     try {
       await authApi.login(email, password);
+      // rows fetched for the previous session belong to someone else
+      invalidateUserRecommendations();
       await refreshMe();
       await refreshMyList();
       toast.success("Logged in successfully");
@@ -122,6 +125,7 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
 
   async function logout() {
     await authApi.logout();
+    invalidateUserRecommendations();
     setUser(null);
     setMyList([]);
     toast.success("Logged out");
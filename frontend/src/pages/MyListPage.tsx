@@ -5,6 +5,7 @@ import type { Movie } from "../types/Movie";
 import type { TVShow } from "../types/TVShow";
 
 import { fetchMyList, removeFromMyList } from "../api/myList";
+import { invalidateUserRecommendations } from "../api/user_recommendations";
 
 import { toast } from "react-hot-toast";
 
@@ -94,6 +95,7 @@ function MyListPage() {
       return;
     }
 
+    invalidateUserRecommendations();
     toast.success("Preferences reset");
 
     navigate("/onboarding");
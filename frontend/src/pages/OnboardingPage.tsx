@@ -1,5 +1,6 @@
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
+import { invalidateUserRecommendations } from "../api/user_recommendations";
 
 type MediaItem = {
   tmdb_id: number;
@@ -176,6 +177,7 @@ export default function OnboardingPage() {
       }),
     });
 
+    invalidateUserRecommendations();
     navigate("/");
   }
 